@@ -4,17 +4,20 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.tools import Tool
 from serpapi.google_search import GoogleSearch
 import os
+import sys
 import json
 from dotenv import load_dotenv
 from instaScraper import get_details, extract, get_post_urls  
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "byob-gpt"))
+from search_cache import cached_search
+
 load_dotenv()
 
 def search_instagram_url(brand, api_key):
     """Use SerpAPI to find Instagram profile URL for the brand."""
     query = f"{brand} official Instagram account site:instagram.com"
-    search = GoogleSearch({"q": query, "api_key": api_key})
-    results = search.get_dict()
+    results = cached_search("serpapi", query, lambda: GoogleSearch({"q": query, "api_key": api_key}).get_dict())
 
     urls = []
     if "organic_results" in results:
@@ -2,19 +2,22 @@ from apify_client import ApifyClient
 from langchain_google_genai import ChatGoogleGenerativeAI
 from serpapi.google_search import GoogleSearch
 import os
+import sys
 import json
 from dotenv import load_dotenv
 from profile_details import get_details as get_profile_details, extract as extract_profile
 from post_details import get_details as get_post_details, extract as extract_post
 from comment_scraper import extract_comments
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "byob-gpt"))
+from search_cache import cached_search
+
 load_dotenv()
 
 def search_linkedin_url(brand, api_key):
     """Use SerpAPI to find LinkedIn company profile URL."""
     query = f"{brand} LinkedIn page site:linkedin.com/company"
-    search = GoogleSearch({"q": query, "api_key": api_key})
-    results = search.get_dict()
+    results = cached_search("serpapi", query, lambda: GoogleSearch({"q": query, "api_key": api_key}).get_dict())
 
     urls = []
     if "organic_results" in results:
@@ -2,15 +2,17 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from serpapi.google_search import GoogleSearch
 from profile_details import get_details as get_profile_details, extract as extract_profile
 from post_details import get_details as get_post_details, extract as extract_posts
-import os, json
+import os, sys, json
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "byob-gpt"))
+from search_cache import cached_search
+
 load_dotenv()
 
 def search_twitter_urls(brand, api_key):
     query = f"{brand} official Twitter account site:x.com"
-    search = GoogleSearch({"q": query, "api_key": api_key})
-    results = search.get_dict()
+    results = cached_search("serpapi", query, lambda: GoogleSearch({"q": query, "api_key": api_key}).get_dict())
 
     urls = []
     if "organic_results" in results:
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_CASSETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes")
+
+# Clients, .env and tokenizers load on first use, so importing byob as a
+# library should stay well under this
+IMPORT_BUDGET_SECONDS = 0.15
+
+
+def throwaway_caches():
+    """Point the on-disk caches at a fresh temp directory and switch them and
+    domain health off. The caches read these when first imported, so call this
+    before importing pipeline or byob."""
+    cache_dir = tempfile.mkdtemp(prefix="byob-bench-")
+    os.environ["BYOB_CACHE_DIR"] = cache_dir
+    os.environ["BYOB_PAGE_CACHE"] = "0"
+    os.environ["BYOB_LLM_CACHE"] = "0"
+    os.environ["BYOB_SEARCH_CACHE"] = "0"
+    os.environ["BYOB_DOMAIN_HEALTH"] = "0"
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    return cache_dir
+
+def cassette_path(brand, cassette=None):
+    return cassette or os.path.join(DEFAULT_CASSETTE_DIR, f"{brand.lower().replace(' ', '-')}.json")
+
+def parse_latency(values):
+    import replay
+    latency = {}
+    for value in values or []:
+        kind, seconds = value.split("=")
+        if kind not in replay.KINDS:
+            raise ValueError(f"Unknown call kind {kind}; expected one of {replay.KINDS}")
+        latency[kind] = float(seconds)
+    return latency
+
+def record(brand, pillars, cassette, **options):
+    import replay
+    from byob import score_brand
+    os.makedirs(os.path.dirname(cassette) or ".", exist_ok=True)
+    replay.load(cassette, "record")
+    result = score_brand(brand, pillars, store=False, **options)
+    replay.save()
+    print(f"Recorded {replay.counts()} into {cassette}")
+    return result
+
+def run_benchmark(brand, pillars, cassette, repeat=3, latency=None, **options):
+    """Replay a recorded brand run repeat times and report where the time went."""
+    import metrics
+    import replay
+    from byob import PILLARS, score_brand
+    runs = []
+    for _ in range(repeat):
+        metrics.reset()
+        replay.load(cassette, "replay", latency)
+        start = time.perf_counter()
+        score_brand(brand, pillars, store=False, **options)
+        runs.append({
+            "wall_seconds": round(time.perf_counter() - start, 4),
+            "stages": metrics.snapshot(),
+            "calls": replay.counts(),
+        })
+
+    walls = [run["wall_seconds"] for run in runs]
+    return {
+        "brand": brand,
+        "pillars": pillars or list(PILLARS),
+        "options": options,
+        "latency": replay.LATENCY,
+        "wall_seconds": {
+            "min": min(walls),
+            "median": round(statistics.median(walls), 4),
+            "max": max(walls),
+        },
+        "runs": runs,
+    }
+
+def import_time(module="byob", repeat=5, budget=IMPORT_BUDGET_SECONDS):
+    """Seconds to import module in a fresh interpreter with no API keys set."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    env = {
+        name: value for name, value in os.environ.items()
+        if name not in ("OPENAI_API_KEY", "CUSTOM_SEARCH_API_KEY", "SEARCH_ENGINE_ID")
+    }
+    seconds = [
+        float(subprocess.run(
+            [sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1])
+        for _ in range(repeat)
+    ]
+    median = statistics.median(seconds)
+    return {
+        "module": module,
+        "seconds": {"min": round(min(seconds), 4), "median": round(median, 4), "max": round(max(seconds), 4)},
+        "budget": budget,
+        "within_budget": median <= budget,
+    }
+
+def main():
+    # Benchmarks must exercise the pipeline itself, not whatever the caches
+    # and domain health remember from earlier runs
+    throwaway_caches()
+    import pipeline
+    from byob import PILLARS
+
+    parser = argparse.ArgumentParser(description='Record byob runs into cassettes and benchmark them offline')
+    parser.add_argument('mode', choices=["record", "replay", "import"],
+                        help='import times importing byob against IMPORT_BUDGET_SECONDS')
+    parser.add_argument('--brand', type=str, help='Brand to record or replay')
+    parser.add_argument('--pillars', nargs='+', choices=list(PILLARS), help='Pillars to run (default: all)')
+    parser.add_argument('--cassette', type=str, help='Cassette file (default: cassettes/<brand>.json)')
+    parser.add_argument('--repeat', type=int, default=3, help='Replay runs to time')
+    parser.add_argument('--latency', nargs='*', help='Injected seconds per call, e.g. openai=0.8 google_cse=0.3 http=0.5')
+    parser.add_argument('--summary_mode', choices=["sequential", "map_reduce"], default="sequential",
+                        help='Must match the mode the cassette was recorded with')
+    parser.add_argument('--chunk_top_k', type=int, default=pipeline.DEFAULT_OPTIONS["chunk_top_k"],
+                        help='Must match the value the cassette was recorded with')
+    parser.add_argument('--executor', choices=["threads", "dag"], default="threads")
+    parser.add_argument('--output', type=str, help='Write the benchmark report to this file')
+    args = parser.parse_args()
+
+    if args.mode == "import":
+        report = import_time(repeat=args.repeat)
+        print(json.dumps(report, indent=4))
+        sys.exit(0 if report["within_budget"] else 1)
+    if not args.brand:
+        parser.error("--brand is required to record or replay")
+
+    cassette = cassette_path(args.brand, args.cassette)
+    # Which parameter first claims a page shared across parameters depends on
+    # thread timing, so cassettes only collapse duplicates within a parameter;
+    # the dag executor claims pages as they arrive, so it cannot collapse any
+    options = {
+        "summary_mode": args.summary_mode,
+        "chunk_top_k": args.chunk_top_k,
+        "executor": args.executor,
+        "dedup": "parameter" if args.executor == "threads" else None,
+    }
+    if args.mode == "record":
+        record(args.brand, args.pillars, cassette, **options)
+        return
+
+    report = run_benchmark(
+        args.brand, args.pillars, cassette, args.repeat, parse_latency(args.latency), **options
+    )
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import datetime
+import dedup
+import domain_health
+import json
+import llm_backends
+import llm_cache
+import metrics
+import pipeline
+import query_planner
+import rate_limit
+import results_store
+import search_cache
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from access import execute_access_pipeline
+from customer import execute_sentiment_pipeline
+from financial import execute_pipeline as execute_financial_pipeline
+from pricing import execute_pricing_pipeline
+
+PILLARS = {
+    "access": execute_access_pipeline,
+    "sentiment": execute_sentiment_pipeline,
+    "financial": execute_financial_pipeline,
+    "pricing": execute_pricing_pipeline,
+}
+
+BRAND_WORKERS = 3
+
+# Score a brand on every pillar at once, sharing the clients in pipeline.py
+def score_brand(company_name, pillars=None, store=True, **options):
+    selected = pillars or list(PILLARS)
+    # With dedup="run", pages that turn up under several pillars are summarized once per brand
+    if options.get("dedup") == "run":
+        options.setdefault("duplicates", dedup.DuplicateIndex())
+    # Stored runs keep each parameter's query, sources and RAG response
+    if store and options.get("trace") is None:
+        options["trace"] = {}
+    started_at = time.time()
+
+    with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+        futures = {
+            name: executor.submit(PILLARS[name], company_name, **options)
+            for name in selected
+        }
+        # A failing pillar is recorded under "Error"; the others are still kept and stored
+        reports, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                reports[name] = future.result()
+            except Exception as e:
+                print(f"Failed to score {company_name} on {name}: {e}")
+                errors[name] = str(e)
+    if options.get("duplicates") is not None:
+        print(f"Duplicate pages for {company_name}: {options['duplicates'].stats()}")
+    result = {"Company": company_name}
+    for name in selected:
+        report = reports.get(name)
+        if not report:
+            if name not in errors:
+                print(f"No {name} data extracted for {company_name}.")
+            continue
+        result.update({key: value for key, value in report.items() if key != "Company"})
+    if errors:
+        result["Error"] = errors
+
+    if store and reports:
+        run_id = results_store.record_run(
+            company_name, reports, options["trace"], started_at,
+            models={"summary": pipeline.summary_model(), "extraction": pipeline.EXTRACTION_MODEL},
+            options=options, report=result,
+        )
+        print(f"Stored {company_name} as run {run_id} in {results_store.RESULTS_PATH}")
+    return result
+
+def read_brands(filepath):
+    with open(filepath, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+# Score many brands with a bounded pool; a failing brand is recorded, not fatal
+def score_brands(brands, pillars=None, workers=BRAND_WORKERS, store=True, **options):
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(brands)))) as executor:
+        futures = {executor.submit(score_brand, brand, pillars, store, **options): brand for brand in brands}
+        for done, future in enumerate(as_completed(futures), start=1):
+            brand = futures[future]
+            try:
+                results[brand] = future.result()
+            except Exception as e:
+                print(f"Failed to score {brand}: {e}")
+                results[brand] = {"Company": brand, "Error": str(e)}
+            print(f"\n[{done}/{len(brands)}] Finished {brand}\n")
+
+    return {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "pillars": pillars or list(PILLARS),
+        "results": [results[brand] for brand in brands],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Score brands on the byob pillars')
+    parser.add_argument('--brands', type=str, help='Brand list, one brand per line (e.g. brand-social-scraping/brands.txt)')
+    parser.add_argument('--pillars', nargs='+', choices=list(PILLARS), help='Pillars to score (default: all)')
+    parser.add_argument('--workers', type=int, default=BRAND_WORKERS, help='Brands scored at the same time')
+    parser.add_argument('--output', type=str, default='byob_results.json', help='Consolidated output file for --brands')
+    parser.add_argument('--summary_mode', choices=["sequential", "map_reduce"], default="sequential",
+                        help='How pages longer than one chunk are summarized; needs --chunk_top_k 0 to apply')
+    parser.add_argument('--chunk_top_k', type=int, default=pipeline.DEFAULT_OPTIONS["chunk_top_k"],
+                        help='Most relevant passages of each page to summarize; 0 summarizes whole pages')
+    parser.add_argument('--executor', choices=["threads", "dag"], default="threads",
+                        help='dag streams each page through the stages with bounded queues')
+    parser.add_argument('--summary_backend', choices=list(llm_backends.BACKENDS),
+                        help='LLM backend for chunk summaries, e.g. local for an OpenAI-compatible server')
+    parser.add_argument('--plan_queries', action='store_true',
+                        help='A few broad CSE queries per pillar, shared out between its parameters')
+    parser.add_argument('--dedup', choices=["run", "parameter", "off"], default="parameter",
+                        help='Summarize near-duplicate pages once per parameter, once per brand '
+                             '(reusing summaries written for another parameter), or always')
+    parser.add_argument('--adaptive', action='store_true', help='Stop reading search results once two sources agree')
+    parser.add_argument('--fused', action='store_true', help='One structured extraction call per pillar')
+    parser.add_argument('--openai_rpm', type=int, help='OpenAI requests per minute across all workers')
+    parser.add_argument('--cse_rpm', type=int, help='Google CSE requests per minute across all workers')
+    parser.add_argument('--no_store', action='store_true', help='Do not add this run to the results store')
+    parser.add_argument('--metrics_json', type=str, default='byob_metrics.json', help='Per-stage timing, token and cost report')
+    parser.add_argument('--metrics_prom', type=str, default='byob_metrics.prom', help='The same counters in Prometheus text format')
+    args = parser.parse_args()
+
+    if args.openai_rpm:
+        rate_limit.configure("openai", args.openai_rpm)
+    if args.cse_rpm:
+        rate_limit.configure("google_cse", args.cse_rpm)
+    if args.summary_backend:
+        llm_backends.configure("summarize", args.summary_backend)
+
+    options = {
+        "summary_mode": args.summary_mode,
+        "chunk_top_k": args.chunk_top_k,
+        "fused": args.fused,
+        "adaptive": args.adaptive,
+        "executor": args.executor,
+        "plan_queries": args.plan_queries,
+        "dedup": None if args.dedup == "off" else args.dedup,
+    }
+    if args.brands:
+        brands = read_brands(args.brands)
+        result = score_brands(brands, args.pillars, args.workers, not args.no_store, **options)
+        output = args.output
+    else:
+        company = input("Enter the company name: ").strip()
+        result = score_brand(company, args.pillars, not args.no_store, **options)
+        output = f"{company}_byob_report.json"
+
+    with open(output, "w") as f:
+        json.dump(result, f, indent=4)
+    print(f"\nReport saved as {output}")
+    metrics.write_json(args.metrics_json)
+    metrics.write_prometheus(args.metrics_prom)
+    print(f"Metrics saved as {args.metrics_json} and {args.metrics_prom}")
+    print(f"LLM cache: {llm_cache.stats()}")
+    print(f"Search cache: {search_cache.stats()}, CSE calls today: {search_cache.quota_used('google_cse')}")
+    if args.plan_queries:
+        print(f"Query planner: {query_planner.stats()}")
+    print(f"Domains skipped while failing: {domain_health.open_circuits()}")
+
+if __name__ == "__main__":
+    main()
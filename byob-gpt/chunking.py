@@ -0,0 +1,87 @@
+import functools
+import os
+import re
+
+# gpt-4o-mini takes far more than this; the budget keeps each chunk's summary focused
+CHUNK_TOKEN_BUDGET = int(os.getenv("BYOB_CHUNK_TOKENS", 6000))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("BYOB_CHUNK_OVERLAP_TOKENS", 200))
+# Pages are ranked in passages of a few sentences, much finer than a chunk
+RANK_UNIT_TOKENS = int(os.getenv("BYOB_RANK_UNIT_TOKENS", 300))
+
+# A sentence runs up to terminal punctuation followed by whitespace, or to the end of the text
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+(?=\s)|$)", re.S)
+_WORD = re.compile(r"\S+")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    # Loading the BPE ranks takes a while, so it waits for the first page to chunk
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("o200k_base")
+
+def _separator_tokens():
+    # Pieces are joined with a space. A real encoding spends at most one
+    # token on it; under the estimate a quarter token per space keeps the
+    # pieces' total at or above the joined text's count
+    return 1 if _encoding() is not None else 0.25
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Without tiktoken, ~4 characters per token is close enough for English news text
+    return max(1, (len(text) + 3) // 4)
+
+def _pieces(content, max_tokens):
+    # Sentences lazily, with any sentence over max_tokens cut at word boundaries
+    for match in _SENTENCE.finditer(content):
+        sentence = match.group()
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            yield sentence, tokens
+            continue
+        words, words_tokens = [], 0
+        for word in _WORD.finditer(sentence):
+            word_tokens = count_tokens(word.group())
+            if words and _joined_tokens(words_tokens + word_tokens, len(words) + 1) > max_tokens:
+                yield ' '.join(words), _joined_tokens(words_tokens, len(words))
+                words, words_tokens = [], 0
+            words.append(word.group())
+            words_tokens += word_tokens
+        if words:
+            yield ' '.join(words), _joined_tokens(words_tokens, len(words))
+
+def _joined_tokens(tokens, pieces):
+    # Tokens of a chunk of pieces joined with spaces, given their own tokens
+    return tokens + _separator_tokens() * max(0, pieces - 1)
+
+def _overlap_tail(chunk, overlap_tokens):
+    tail, tail_tokens = [], 0
+    for sentence, tokens in reversed(chunk):
+        if _joined_tokens(tail_tokens + tokens, len(tail) + 1) > overlap_tokens:
+            break
+        tail.insert(0, (sentence, tokens))
+        tail_tokens += tokens
+    return tail, tail_tokens
+
+def chunk_content(content, max_tokens=CHUNK_TOKEN_BUDGET, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Yield chunks of whole sentences that fit max_tokens.
+
+    Each chunk after the first repeats up to overlap_tokens of trailing
+    sentences from the previous one.
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    chunk, chunk_tokens, fresh = [], 0, False
+    for sentence, tokens in _pieces(content, max_tokens - overlap_tokens):
+        if fresh and _joined_tokens(chunk_tokens + tokens, len(chunk) + 1) > max_tokens:
+            yield ' '.join(s for s, _ in chunk)
+            chunk, chunk_tokens = _overlap_tail(chunk, overlap_tokens)
+            fresh = False
+        chunk.append((sentence, tokens))
+        chunk_tokens += tokens
+        fresh = True
+    if fresh:
+        yield ' '.join(s for s, _ in chunk)
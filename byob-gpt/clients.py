@@ -0,0 +1,67 @@
+import os
+import threading
+
+# Shared API clients, built on first use rather than at import so importing
+# a byob module costs next to nothing. Each name maps to a factory; get()
+# builds the client once and every thread shares it. override() swaps in a
+# stand-in, for tests or local servers.
+_lock = threading.Lock()
+_factories = {}
+_instances = {}
+_env_loaded = False
+
+
+def env(name, default=None):
+    """os.getenv, after loading .env the first time a setting is read."""
+    global _env_loaded
+    if not _env_loaded:
+        with _lock:
+            if not _env_loaded:
+                from dotenv import load_dotenv
+                load_dotenv()
+                _env_loaded = True
+    return os.getenv(name, default)
+
+def register(name, factory):
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+def get(name):
+    client = _instances.get(name)
+    if client is None:
+        factory = _factories[name]
+        # Build outside the lock; a client building another through get() must not deadlock
+        built = factory()
+        with _lock:
+            client = _instances.setdefault(name, built)
+    return client
+
+def override(name, client):
+    with _lock:
+        _instances[name] = client
+
+def reset(name=None):
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
+
+
+def _openai():
+    from openai import OpenAI
+    env("OPENAI_API_KEY")
+    return OpenAI()
+
+def _customsearch():
+    from googleapiclient.discovery import build
+    # BYOB_CSE_ENDPOINT points searches at another server, e.g. service.py's stand-ins
+    endpoint = env("BYOB_CSE_ENDPOINT")
+    return build(
+        "customsearch", "v1", developerKey=env("CUSTOM_SEARCH_API_KEY"),
+        client_options={"api_endpoint": endpoint} if endpoint else None,
+    )
+
+register("openai", _openai)
+register("customsearch", _customsearch)
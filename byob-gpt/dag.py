@@ -0,0 +1,221 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dedup
+import metrics
+import pipeline
+
+# Stage-pipelined executor for one pillar: every page streams through
+# search -> fetch -> parse -> summarize -> RAG -> extract on its own, so page
+# N+1 downloads while page N is being summarized. Each stage has a fixed
+# number of workers pulling from a queue of at most QUEUE_SIZE items; a slow
+# stage fills its queue and holds back the stages feeding it. The blocking
+# step functions in pipeline.py run on a thread pool with one thread per worker.
+STAGE_WORKERS = {
+    "search": 2,
+    "fetch": pipeline.FETCH_WORKERS,
+    "parse": 2,
+    "summarize": pipeline.SUMMARY_WORKERS,
+    "rag": 3,
+    "extract": 3,
+}
+QUEUE_SIZE = 16
+
+
+class _Parameter:
+    def __init__(self, name, loop):
+        """A parameter's progress through the stages."""
+        self.name = name
+        self.query = None
+        self.pending = 0
+        self.results = {}
+        self.summarized = None
+        # This parameter's pages in the duplicate index (dedup.Claims), if deduplicating
+        self.claims = None
+        self.started = time.perf_counter()
+        self.done = loop.create_future()
+
+
+class PillarRun:
+    def __init__(self, company_name, pillar, options):
+        self.company_name = company_name
+        self.pillar = pillar
+        self.options = options
+        self.stages = [stage for stage in STAGE_WORKERS if not (options["fused"] and stage in ("rag", "extract"))]
+        self.queues = {stage: asyncio.Queue(QUEUE_SIZE) for stage in self.stages}
+        self.collectors = set()
+        self.executor = None
+
+    async def run(self):
+        """Each parameter's extracted dict, or its (query, results) in fused mode, in declaration order."""
+        loop = asyncio.get_running_loop()
+        parameters = [_Parameter(name, loop) for name in self.pillar["parameters"]]
+        with ThreadPoolExecutor(max_workers=sum(STAGE_WORKERS[stage] for stage in self.stages)) as executor:
+            self.executor = executor
+            workers = [
+                asyncio.create_task(self._worker(stage))
+                for stage in self.stages for _ in range(STAGE_WORKERS[stage])
+            ]
+            try:
+                for parameter in parameters:
+                    await self.queues["search"].put((parameter,))
+                return await asyncio.gather(*(parameter.done for parameter in parameters))
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                # One failed parameter cancels the rest; parameters of other
+                # pillars may be waiting on pages they owned
+                for parameter in parameters:
+                    if parameter.claims is not None:
+                        parameter.claims.release()
+
+    async def _worker(self, stage):
+        queue = self.queues[stage]
+        handle = getattr(self, f"_{stage}")
+        while True:
+            item = await queue.get()
+            parameter = item[0]
+            try:
+                if not parameter.done.done():
+                    await handle(*item)
+            except Exception as e:
+                self._fail(parameter, e)
+            finally:
+                queue.task_done()
+
+    def _call(self, parameter, fn, *args):
+        # Blocking steps run on the pool under the parameter's metrics labels
+        def run():
+            with metrics.labelled(self.company_name, self.pillar["name"], parameter.name):
+                return fn(*args)
+        return asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    def _finish(self, parameter, value):
+        if parameter.done.done():
+            return
+        with metrics.labelled(self.company_name, self.pillar["name"], parameter.name):
+            metrics.record_wall(time.perf_counter() - parameter.started)
+        parameter.done.set_result(value)
+
+    def _fail(self, parameter, error):
+        if parameter.claims is not None:
+            parameter.claims.release()
+        if not parameter.done.done():
+            parameter.done.set_exception(error)
+
+    async def _search(self, parameter):
+        print(f"\n🔍 Searching for {parameter.name} data on {self.company_name}...\n")
+        search = await self._call(parameter, pipeline.planned_search, self.company_name, parameter.name, self.options)
+        if not search:
+            print(f"No search results found for {parameter.name}. Skipping...")
+            self._finish(parameter, None)
+            return
+
+        search_results, parameter.query = search
+        parameter.pending = len(search_results)
+        if self.options["dedup"] == "run":
+            parameter.claims = dedup.Claims(self.options["duplicates"])
+        elif self.options["dedup"]:
+            parameter.claims = dedup.Claims(dedup.DuplicateIndex())
+        for order, item in enumerate(search_results, start=1):
+            await self.queues["fetch"].put((parameter, order, item))
+
+    async def _fetch(self, parameter, order, item):
+        downloaded = await self._call(parameter, pipeline.download, item.get('link'))
+        await self.queues["parse"].put((parameter, order, item, downloaded))
+
+    async def _parse(self, parameter, order, item, downloaded):
+        url = item.get('link')
+        snippet = item.get('snippet', '')
+        result = {'order': order, 'link': url, 'title': snippet}
+        web_content = await self._call(parameter, pipeline.parse_download, url, downloaded)
+        if web_content is None:
+            print(f"Error: skipped URL: {url}")
+            result['Summary'] = f"[Fallback summary] {snippet or 'No snippet available.'}"
+            self._page_done(parameter, order, result)
+            return
+
+        entry = None
+        if parameter.claims is not None:
+            # Pages are claimed as they finish parsing, so the representative
+            # of a copy within one parameter is the first to arrive, not the first by rank
+            fingerprint = await self._call(parameter, dedup.simhash, web_content)
+            entry, role = parameter.claims.claim(fingerprint, result)
+            if role != "new":
+                self._page_done(parameter, order, result if role == "shared" else None)
+                return
+        await self.queues["summarize"].put((parameter, order, result, web_content, entry))
+
+    async def _summarize(self, parameter, order, result, web_content, entry):
+        result['Summary'] = await self._call(
+            parameter, pipeline.summarize_page, result, web_content, parameter.query,
+            self.pillar["summary_prompt"], self.options["summary_mode"], self.options["chunk_top_k"],
+        )
+        if entry is not None:
+            parameter.claims.summarized(entry, result['Summary'])
+        self._page_done(parameter, order, result)
+
+    def _page_done(self, parameter, order, result):
+        if result is not None:
+            parameter.results[order] = result
+        parameter.pending -= 1
+        if parameter.pending == 0:
+            # Waiting on other parameters' pages happens outside the stage
+            # workers, so a full summarize queue can never wait on itself
+            collector = asyncio.create_task(self._collect(parameter))
+            self.collectors.add(collector)
+            collector.add_done_callback(self.collectors.discard)
+
+    async def _collect(self, parameter):
+        try:
+            if parameter.claims is not None:
+                pending = [asyncio.wrap_future(future) for future in parameter.claims.pending()]
+                await asyncio.gather(*pending, return_exceptions=True)
+                parameter.claims.collect_shared()
+            parameter.summarized = [parameter.results[order] for order in sorted(parameter.results)]
+            print(f"Processed {len(parameter.summarized)} search results")
+            if self.options["trace"] is not None:
+                self.options["trace"][parameter.name] = {"query": parameter.query, "results": parameter.summarized}
+
+            if self.options["fused"]:
+                self._finish(parameter, (parameter.query, parameter.summarized))
+            else:
+                await self.queues["rag"].put((parameter,))
+        except Exception as e:
+            self._fail(parameter, e)
+
+    async def _rag(self, parameter):
+        print(f"\n Generating RAG response for {parameter.name}...\n")
+        rag_response = await self._call(
+            parameter, pipeline.generate_rag_response, parameter.summarized, parameter.query,
+            parameter.name, self.pillar["rag_prompt"],
+        )
+        if self.options["trace"] is not None:
+            self.options["trace"][parameter.name]["rag_response"] = rag_response
+        if not rag_response:
+            print(f"Failed to generate a RAG response for {parameter.name}. Skipping...")
+            self._finish(parameter, None)
+            return
+        await self.queues["extract"].put((parameter, rag_response))
+
+    async def _extract(self, parameter, rag_response):
+        print(f"\n Extracting {self.pillar['name']} parameters for {parameter.name}...\n")
+        extracted_params = await self._call(parameter, self.pillar["extract"], rag_response, parameter.name)
+        if not extracted_params:
+            print(f"Failed to extract data for {parameter.name}. Skipping...")
+        self._finish(parameter, extracted_params or None)
+
+
+def run_pillar(company_name, pillar, options):
+    """Blocking entry point for pipeline.run_pillar(executor="dag")."""
+    results = asyncio.run(PillarRun(company_name, pillar, options).run())
+    if options["fused"]:
+        return pipeline.fuse_gathered(company_name, pillar, options, results)
+
+    all_results = {}
+    for extracted_params in results:
+        if extracted_params:
+            all_results.update(extracted_params)
+    return all_results
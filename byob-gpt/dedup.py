@@ -0,0 +1,118 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+
+# 64-bit SimHash over word 3-grams; pages within HAMMING_THRESHOLD bits of
+# each other are treated as copies of the same article. Syndicated copies
+# that differ by ~5% of their text (site chrome, a newsletter footer) land
+# around 7 bits apart, unrelated pages around 32.
+SHINGLE_SIZE = 3
+HAMMING_THRESHOLD = 8
+
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text):
+    words = _WORD.findall(text.lower())
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(64):
+        if sum(1 for h in hashes if h >> bit & 1) > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    def __init__(self, threshold=HAMMING_THRESHOLD):
+        """Fingerprints seen during one run, each owned by the first page that claimed it."""
+        self.threshold = threshold
+        self.entries = []
+        self.lock = threading.Lock()
+        self.collapsed = 0
+
+    def claim(self, fingerprint, owner, link):
+        """Return (entry, is_new). entry["summary"] is a Future set by the owner."""
+        with self.lock:
+            for entry in self.entries:
+                if hamming(entry["fingerprint"], fingerprint) <= self.threshold:
+                    self.collapsed += 1
+                    entry["links"].append(link)
+                    return entry, False
+            entry = {
+                "fingerprint": fingerprint,
+                "owner": owner,
+                "link": link,
+                "links": [link],
+                "summary": Future(),
+            }
+            self.entries.append(entry)
+            return entry, True
+
+    def stats(self):
+        with self.lock:
+            return {"distinct_pages": len(self.entries), "collapsed_pages": self.collapsed}
+
+
+class Claims:
+    def __init__(self, index):
+        """One parameter's pages in a DuplicateIndex, shared by the threads and dag executors.
+
+        Pages this parameter claims first are its own to summarize. A copy of
+        one of them is folded into its 'Also published at'; a copy of a page
+        another parameter owns is kept with 'Duplicate of' and reuses that
+        parameter's summary once collect_shared() runs.
+        """
+        self.index = index
+        self.representatives = {}
+        self.owned = []
+        self.shared = []
+
+    def claim(self, fingerprint, result):
+        """Return (entry, role): role is "new", "own copy" (drop result) or "shared"."""
+        entry, is_new = self.index.claim(fingerprint, self, result['link'])
+        if is_new:
+            self.representatives[id(entry)] = result
+            self.owned.append(entry)
+            return entry, "new"
+        print(f"{result['link']} duplicates {entry['link']}; summarized once")
+        if entry["owner"] is self:
+            self.representatives[id(entry)].setdefault('Also published at', []).append(result['link'])
+            return entry, "own copy"
+        result['Duplicate of'] = entry['link']
+        self.shared.append((result, entry))
+        return entry, "shared"
+
+    def summarized(self, entry, summary):
+        entry["summary"].set_result(summary)
+
+    def release(self):
+        # Never leave another parameter waiting on a page this one did not summarize
+        for entry in self.owned:
+            if not entry["summary"].done():
+                entry["summary"].set_exception(RuntimeError(f"{entry['link']} was not summarized"))
+
+    def pending(self):
+        """Futures of the pages collect_shared() waits on."""
+        return [entry["summary"] for _, entry in self.shared]
+
+    def collect_shared(self):
+        """Fill in every shared copy's summary, blocking until its owner is done.
+
+        Call it only after release() or after summarizing everything owned,
+        so parameters waiting on each other's pages cannot deadlock.
+        """
+        for result, entry in self.shared:
+            try:
+                result['Summary'] = entry["summary"].result()
+            except Exception as e:
+                print(f"Error: no summary for duplicate {result['link']}: {e}")
+                result['Summary'] = f"[Fallback summary] {result['title'] or 'No snippet available.'}"
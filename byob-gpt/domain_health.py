@@ -0,0 +1,219 @@
+import datetime
+import os
+import time
+from urllib.parse import urlsplit
+
+import storage
+
+# Per-domain fetch history kept across runs. Each domain has a circuit
+# breaker: after FAILURE_THRESHOLD domain failures (is_domain_failure or a
+# bot wall) in a row, or a success rate below MIN_SUCCESS_RATE, it opens
+# and fetches go straight to the snippet fallback. It reopens for a single
+# trial fetch after a cooldown that doubles with every trip, up to
+# MAX_COOLDOWN. Slow domains get a tighter timeout.
+HEALTH_PATH = os.path.join(storage.CACHE_DIR, "domains.db")
+ENABLED = os.getenv("BYOB_DOMAIN_HEALTH", "1") != "0"
+
+WINDOW = 50
+FAILURE_THRESHOLD = 3
+MIN_SAMPLES = 5
+MIN_SUCCESS_RATE = 0.2
+COOLDOWN = int(os.getenv("BYOB_DOMAIN_COOLDOWN", 6 * 3600))
+MAX_COOLDOWN = 7 * 24 * 3600
+
+DEFAULT_TIMEOUT = 10
+SLOW_SECONDS = 5
+SLOW_TIMEOUT = 4
+
+# Bot walls answer 200 with a short interstitial instead of the article
+BOT_WALL_MARKERS = (
+    "captcha", "are you a robot", "access denied", "enable javascript", "verify you are human",
+    "checking your browser",
+)
+BOT_WALL_MAX_CHARS = 2000
+
+# Domains whose reopened breaker already has its trial fetch in flight
+_trials = set()
+_db = storage.Database(HEALTH_PATH, """
+    CREATE TABLE IF NOT EXISTS fetches (
+        domain TEXT NOT NULL,
+        ok INTEGER NOT NULL,
+        seconds REAL NOT NULL,
+        reason TEXT,
+        at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS fetches_domain ON fetches (domain, at);
+    CREATE TABLE IF NOT EXISTS breakers (
+        domain TEXT PRIMARY KEY,
+        consecutive_failures INTEGER NOT NULL,
+        trips INTEGER NOT NULL,
+        open_until REAL,
+        last_failure TEXT,
+        last_failure_at REAL
+    );
+""")
+
+
+def domain_of(url):
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def failure_reason(error):
+    import requests
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code}"
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return "connection error"
+    return type(error).__name__
+
+def is_domain_failure(error):
+    """Whether a failed fetch says something about the domain rather than one page.
+
+    A 404 or 410 is one dead article, so only refusals (403, 429), server
+    errors, timeouts and connection errors count towards the breaker.
+    """
+    import requests
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status in (403, 429) or status >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+def is_bot_wall(text):
+    if len(text) > BOT_WALL_MAX_CHARS:
+        return False
+    lowered = text.lower()
+    return any(marker in lowered for marker in BOT_WALL_MARKERS)
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def _recent(conn, domain):
+    return conn.execute(
+        "SELECT ok, seconds FROM fetches WHERE domain = ? ORDER BY at DESC LIMIT ?", (domain, WINDOW)
+    ).fetchall()
+
+def allow(url):
+    """Return (allowed, reason); reason says why a fetch was refused."""
+    if not ENABLED:
+        return True, None
+    domain = domain_of(url)
+    with _db.lock:
+        row = _db.connect().execute(
+            "SELECT open_until, last_failure FROM breakers WHERE domain = ?", (domain,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return True, None
+        open_until, last_failure = row
+        if time.time() < open_until:
+            until = datetime.datetime.fromtimestamp(open_until).isoformat(timespec="minutes")
+            return False, f"{domain} is failing ({last_failure}), retrying after {until}"
+        if domain in _trials:
+            return False, f"{domain} is failing ({last_failure}), trial fetch in flight"
+        _trials.add(domain)
+        return True, None
+
+def release(url):
+    """End the trial fetch allow() let through, whether or not its outcome was recorded."""
+    with _db.lock:
+        _trials.discard(domain_of(url))
+
+def timeout(url):
+    if not ENABLED:
+        return DEFAULT_TIMEOUT
+    with _db.lock:
+        recent = _recent(_db.connect(), domain_of(url))
+    if len(recent) >= MIN_SAMPLES and _percentile([seconds for _, seconds in recent], 90) >= SLOW_SECONDS:
+        return SLOW_TIMEOUT
+    return DEFAULT_TIMEOUT
+
+def record(url, ok, seconds, reason=None):
+    if not ENABLED:
+        return
+    domain = domain_of(url)
+    now = time.time()
+    with _db.lock:
+        conn = _db.connect()
+        conn.execute(
+            "INSERT INTO fetches (domain, ok, seconds, reason, at) VALUES (?, ?, ?, ?, ?)",
+            (domain, int(ok), seconds, reason, now),
+        )
+        conn.execute(
+            "DELETE FROM fetches WHERE domain = ? AND at < ("
+            "SELECT MIN(at) FROM (SELECT at FROM fetches WHERE domain = ? ORDER BY at DESC LIMIT ?))",
+            (domain, domain, WINDOW),
+        )
+        row = conn.execute(
+            "SELECT consecutive_failures, trips, open_until, last_failure, last_failure_at FROM breakers "
+            "WHERE domain = ?",
+            (domain,),
+        ).fetchone()
+        consecutive, trips, open_until, last_failure, last_failure_at = row or (0, 0, None, None, None)
+        # An outcome after the cooldown, with the breaker not yet closed, is its trial's
+        trial = open_until is not None and open_until <= now
+
+        open_until = None
+        if ok:
+            consecutive, trips = 0, 0
+        else:
+            consecutive += 1
+            last_failure, last_failure_at = reason, now
+            recent = _recent(conn, domain)
+            success_rate = sum(ok for ok, _ in recent) / len(recent)
+            if trial or consecutive >= FAILURE_THRESHOLD or (
+                len(recent) >= MIN_SAMPLES and success_rate < MIN_SUCCESS_RATE
+            ):
+                trips += 1
+                open_until = now + min(COOLDOWN * 2 ** (trips - 1), MAX_COOLDOWN)
+                print(f"Circuit open for {domain} after {reason}")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO breakers "
+            "(domain, consecutive_failures, trips, open_until, last_failure, last_failure_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (domain, consecutive, trips, open_until, last_failure, last_failure_at),
+        )
+        conn.commit()
+
+def health(domain):
+    """Success rate, latency percentiles and breaker state for one domain."""
+    with _db.lock:
+        conn = _db.connect()
+        recent = _recent(conn, domain)
+        row = conn.execute(
+            "SELECT open_until, trips, last_failure, last_failure_at FROM breakers WHERE domain = ?", (domain,)
+        ).fetchone()
+    seconds = [value for _, value in recent]
+    open_until, trips, last_failure, last_failure_at = row or (None, 0, None, None)
+    return {
+        "samples": len(recent),
+        "success_rate": round(sum(ok for ok, _ in recent) / len(recent), 3) if recent else None,
+        "p50_seconds": round(_percentile(seconds, 50), 3) if seconds else None,
+        "p90_seconds": round(_percentile(seconds, 90), 3) if seconds else None,
+        "last_failure": last_failure,
+        "last_failure_at": last_failure_at,
+        "open_until": open_until,
+        "trips": trips,
+    }
+
+def open_circuits():
+    with _db.lock:
+        rows = _db.connect().execute(
+            "SELECT domain FROM breakers WHERE open_until > ? ORDER BY domain", (time.time(),)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+def reset(domain=None):
+    with _db.lock:
+        conn = _db.connect()
+        if domain is None:
+            conn.execute("DELETE FROM fetches")
+            conn.execute("DELETE FROM breakers")
+        else:
+            conn.execute("DELETE FROM fetches WHERE domain = ?", (domain,))
+            conn.execute("DELETE FROM breakers WHERE domain = ?", (domain,))
+        conn.commit()
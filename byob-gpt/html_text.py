@@ -0,0 +1,73 @@
+import re
+from html.parser import HTMLParser
+
+try:
+    from selectolax.parser import HTMLParser as LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+
+class TextTooLong(Exception):
+    pass
+
+
+class _TextCollector(HTMLParser):
+    def __init__(self, max_chars):
+        """Collect visible text without building a tree, giving up past max_chars."""
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        data = data.strip()
+        if not data:
+            return
+        self.parts.append(data)
+        self.length += len(data) + 1
+        if self.max_chars and self.length > self.max_chars:
+            raise TextTooLong()
+
+
+def decode_html(data, content_type=""):
+    match = re.search(r"charset=([\w-]+)", content_type or "", re.I)
+    charset = match.group(1) if match else None
+    if not charset:
+        meta = _CHARSET.search(data[:4096])
+        charset = meta.group(1).decode("ascii") if meta else "utf-8"
+    try:
+        return data.decode(charset, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+def extract_text(html, max_chars=None):
+    """Return the visible text of html joined by spaces, or None if it exceeds max_chars."""
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        for node in tree.css(", ".join(SKIPPED_TAGS)):
+            node.decompose()
+        text = tree.root.text(separator=' ', strip=True) if tree.root is not None else ''
+        return None if max_chars and len(text) > max_chars else text
+
+    collector = _TextCollector(max_chars)
+    try:
+        collector.feed(html)
+        collector.close()
+    except TextTooLong:
+        return None
+    return ' '.join(collector.parts)
@@ -0,0 +1,347 @@
+import argparse
+import datetime
+import json
+import os
+import socket
+import threading
+import time
+
+import byob
+import dedup
+import pipeline
+import results_store
+import storage
+
+# Durable queue of brand x pillar scoring jobs in one SQLite file, shared by
+# any number of `job_queue.py work` processes. A worker leases a job for
+# LEASE_SECONDS and keeps renewing it while the pillar runs; a worker that
+# dies stops renewing, and once the lease lapses another worker takes the
+# job over. Failed jobs are retried with a doubling backoff until they have
+# been attempted max_attempts times. Finished pillars go to the results
+# store as they complete, so a crash loses at most the jobs in flight.
+QUEUE_PATH = os.getenv("BYOB_QUEUE_DB", os.path.join(storage.REPO_DIR, "byob_jobs.db"))
+LEASE_SECONDS = int(os.getenv("BYOB_JOB_LEASE", 300))
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 60
+POLL_SECONDS = 5
+THROUGHPUT_WINDOW = 600
+
+# Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+_db = storage.Database(QUEUE_PATH, """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        batch TEXT NOT NULL,
+        brand TEXT NOT NULL,
+        pillar TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        worker TEXT,
+        lease_until REAL,
+        not_before REAL NOT NULL DEFAULT 0,
+        error TEXT,
+        report TEXT,
+        run_id INTEGER,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        UNIQUE (batch, brand, pillar)
+    );
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+    CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, status);
+""", pragmas=["journal_mode = WAL"], autocommit=True)
+
+
+def _where(batch, *conditions):
+    conditions = [*conditions, "batch = ?"] if batch else list(conditions)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), ((batch,) if batch else ())
+
+def _job(row):
+    keys = ("id", "batch", "brand", "pillar", "attempts", "max_attempts")
+    return dict(zip(keys, row))
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue(brands, pillars=None, batch=None, max_attempts=MAX_ATTEMPTS):
+    """Add one job per brand and pillar; jobs already in the batch are left as they are."""
+    batch = batch or datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    now = time.time()
+    rows = [(batch, brand, pillar, max_attempts, now) for brand in brands for pillar in pillars or byob.PILLARS]
+    with _db.lock:
+        conn = _db.connect()
+        before = conn.total_changes
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO jobs (batch, brand, pillar, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("COMMIT")
+        added = conn.total_changes - before
+    return batch, added
+
+def claim(worker, batch=None, lease=LEASE_SECONDS):
+    """Lease the next runnable job to worker, or return None.
+
+    Runnable jobs are queued ones past their retry backoff, and leased ones
+    whose worker stopped renewing. A lapsed job that has used up its
+    attempts is marked failed instead of being handed out again.
+    """
+    now = time.time()
+    with _db.lock:
+        conn = _db.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            lapsed, params = _where(batch, "status = 'leased'", "lease_until < ?", "attempts >= max_attempts")
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                f"error = 'lease expired on attempt ' || attempts {lapsed}",
+                (now, now, *params),
+            )
+            runnable, params = _where(
+                batch, "((status = 'queued' AND not_before <= ?) OR (status = 'leased' AND lease_until < ?))"
+            )
+            row = conn.execute(
+                f"SELECT id, batch, brand, pillar, attempts, max_attempts FROM jobs {runnable} ORDER BY id LIMIT 1",
+                (now, now, *params),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "started_at = ? WHERE id = ?",
+                    (worker, now + lease, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if row is None:
+        return None
+    job = _job(row)
+    job["attempts"] += 1
+    return job
+
+def renew(job_id, worker, lease=LEASE_SECONDS):
+    """Extend a lease; False once the job was taken over by another worker."""
+    with _db.lock:
+        cursor = _db.connect().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease, job_id, worker),
+        )
+    return cursor.rowcount == 1
+
+def complete(job_id, worker, report, run_id=None):
+    with _db.lock:
+        cursor = _db.connect().execute(
+            "UPDATE jobs SET status = 'done', report = ?, run_id = ?, error = NULL, finished_at = ?, "
+            "lease_until = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(report), run_id, time.time(), job_id, worker),
+        )
+    return cursor.rowcount == 1
+
+def fail(job_id, worker, error):
+    """Requeue the job after a backoff, or mark it failed once it is out of attempts."""
+    now = time.time()
+    with _db.lock:
+        conn = _db.connect()
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'leased'",
+            (job_id, worker),
+        ).fetchone()
+        if row is None:
+            return None
+        attempts, max_attempts = row
+        if attempts >= max_attempts:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (error, now, job_id, worker),
+            )
+            return "failed"
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', error = ?, not_before = ?, lease_until = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (error, now + RETRY_BACKOFF * 2 ** (attempts - 1), job_id, worker),
+        )
+        return "queued"
+
+def retry(batch=None):
+    """Give failed jobs a fresh set of attempts."""
+    failed, params = _where(batch, "status = 'failed'")
+    with _db.lock:
+        cursor = _db.connect().execute(
+            f"UPDATE jobs SET status = 'queued', attempts = 0, not_before = 0, finished_at = NULL {failed}", params
+        )
+    return cursor.rowcount
+
+def progress(batch=None):
+    """Jobs by status, jobs finished per minute over the last THROUGHPUT_WINDOW, and an ETA."""
+    now = time.time()
+    every, params = _where(batch)
+    finished, _ = _where(batch, "status = 'done'", "finished_at >= ?")
+    running, _ = _where(batch, "status = 'leased'", "lease_until >= ?")
+    with _db.lock:
+        conn = _db.connect()
+        counts = dict(conn.execute(f"SELECT status, COUNT(*) FROM jobs {every} GROUP BY status", params).fetchall())
+        recent = conn.execute(
+            f"SELECT COUNT(*), MIN(finished_at) FROM jobs {finished}", (now - THROUGHPUT_WINDOW, *params)
+        ).fetchone()
+        workers = conn.execute(f"SELECT COUNT(DISTINCT worker) FROM jobs {running}", (now, *params)).fetchone()[0]
+    stats = {status: counts.get(status, 0) for status in ("queued", "leased", "done", "failed")}
+    stats["total"] = sum(counts.values())
+    stats["workers"] = workers
+    finished, first = recent
+    # Measured from the first finish in the window, so a fresh batch does not read as slow
+    elapsed = max(now - first, 60) if finished else None
+    stats["jobs_per_minute"] = round(finished / elapsed * 60, 2) if finished else 0.0
+    remaining = stats["queued"] + stats["leased"]
+    stats["eta_minutes"] = round(remaining / stats["jobs_per_minute"], 1) if finished and remaining else None
+    return stats
+
+def batch_results(batch):
+    """The batch in score_brands' layout: one merged report per brand, failures under "Error"."""
+    with _db.lock:
+        rows = _db.connect().execute(
+            "SELECT brand, pillar, status, report, error FROM jobs WHERE batch = ? ORDER BY id", (batch,)
+        ).fetchall()
+    results, pillars = {}, []
+    for brand, pillar, status, report, error in rows:
+        result = results.setdefault(brand, {"Company": brand})
+        if pillar not in pillars:
+            pillars.append(pillar)
+        if status == "done":
+            result.update({key: value for key, value in (json.loads(report) or {}).items() if key != "Company"})
+        elif status == "failed":
+            result.setdefault("Error", {})[pillar] = error
+        else:
+            result.setdefault("Pending", []).append(pillar)
+    return {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "batch": batch,
+        "pillars": pillars,
+        "results": list(results.values()),
+    }
+
+
+def run_job(job, options):
+    """Score one brand on one pillar and add it to the results store; returns (report, run_id)."""
+    run_options = {**options, "duplicates": dedup.DuplicateIndex(), "trace": {}}
+    started_at = time.time()
+    report = byob.PILLARS[job["pillar"]](job["brand"], **run_options)
+    result = {"Company": job["brand"], **{key: value for key, value in (report or {}).items() if key != "Company"}}
+    run_id = results_store.record_run(
+        job["brand"], {job["pillar"]: report}, run_options["trace"], started_at,
+        models={"summary": pipeline.summary_model(), "extraction": pipeline.EXTRACTION_MODEL},
+        options=options, report=result,
+    )
+    return result, run_id
+
+def _keep_leased(job, worker, stop):
+    while not stop.wait(LEASE_SECONDS / 3):
+        if not renew(job["id"], worker):
+            print(f"Lost the lease on job {job['id']} ({job['brand']} {job['pillar']}); another worker has it")
+            return
+
+def work(worker, batch=None, options=None, wait=False):
+    """Run jobs until the queue is drained, or forever with wait=True."""
+    options = options or {}
+    while True:
+        job = claim(worker, batch)
+        if job is None:
+            stats = progress(batch)
+            if not wait and stats["queued"] == 0 and stats["leased"] == 0:
+                return
+            # Queued jobs waiting out a backoff, or leased ones that may yet lapse
+            time.sleep(POLL_SECONDS)
+            continue
+
+        print(f"\n{worker} scoring {job['brand']} on {job['pillar']} (attempt {job['attempts']}/{job['max_attempts']})\n")
+        started = time.perf_counter()
+        stop = threading.Event()
+        renewer = threading.Thread(target=_keep_leased, args=(job, worker, stop), daemon=True)
+        renewer.start()
+        try:
+            report, run_id = run_job(job, options)
+        except Exception as e:
+            outcome = fail(job["id"], worker, f"{type(e).__name__}: {e}")
+            print(f"Job {job['id']} ({job['brand']} {job['pillar']}) failed: {e}; {outcome or 'lease lost'}")
+        else:
+            if not complete(job["id"], worker, report, run_id):
+                print(f"Job {job['id']} finished after its lease was taken over; keeping the other worker's result")
+        finally:
+            stop.set()
+            renewer.join()
+
+        stats = progress(batch)
+        print(
+            f"[{stats['done'] + stats['failed']}/{stats['total']}] {job['brand']} {job['pillar']} "
+            f"in {time.perf_counter() - started:.1f}s; {stats['jobs_per_minute']} jobs/min across "
+            f"{stats['workers']} workers, ETA {stats['eta_minutes']} min"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description='Durable byob scoring queue shared by worker processes')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    add = subcommands.add_parser("enqueue", help='Add brand x pillar jobs')
+    add.add_argument('--brands', type=str, required=True, help='Brand list, one brand per line')
+    add.add_argument('--pillars', nargs='+', choices=list(byob.PILLARS), help='Pillars to score (default: all)')
+    add.add_argument('--batch', type=str, help='Batch name (default: a timestamp); re-enqueueing a batch only adds what is missing')
+    add.add_argument('--max_attempts', type=int, default=MAX_ATTEMPTS)
+
+    run = subcommands.add_parser("work", help='Run jobs from the queue')
+    run.add_argument('--batch', type=str, help='Only run jobs from this batch')
+    run.add_argument('--slots', type=int, default=1, help='Jobs run at the same time by this process')
+    run.add_argument('--wait', action='store_true', help='Keep polling once the queue is empty')
+    run.add_argument('--summary_mode', choices=["sequential", "map_reduce"], default="sequential")
+    run.add_argument('--chunk_top_k', type=int, default=pipeline.DEFAULT_OPTIONS["chunk_top_k"])
+    run.add_argument('--executor', choices=["threads", "dag"], default="threads")
+    run.add_argument('--plan_queries', action='store_true')
+    run.add_argument('--fused', action='store_true')
+
+    status = subcommands.add_parser("status", help='Progress and throughput')
+    status.add_argument('--batch', type=str)
+    status.add_argument('--watch', type=float, help='Print again every this many seconds')
+
+    subcommands.add_parser("retry", help='Requeue failed jobs').add_argument('--batch', type=str)
+
+    export = subcommands.add_parser("export", help='Write a batch out like byob.py --brands')
+    export.add_argument('batch')
+    export.add_argument('--output', type=str, default='byob_results.json')
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        batch, added = enqueue(byob.read_brands(args.brands), args.pillars, args.batch, args.max_attempts)
+        print(f"Queued {added} jobs in batch {batch}")
+    elif args.command == "work":
+        options = {
+            "summary_mode": args.summary_mode,
+            "chunk_top_k": args.chunk_top_k,
+            "executor": args.executor,
+            "plan_queries": args.plan_queries,
+            "fused": args.fused,
+        }
+        workers = [
+            threading.Thread(target=work, args=(f"{worker_name()}:{slot}", args.batch, options, args.wait))
+            for slot in range(args.slots)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        print(f"Queue drained: {progress(args.batch)}")
+    elif args.command == "status":
+        while True:
+            print(json.dumps(progress(args.batch)))
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    elif args.command == "retry":
+        print(f"Requeued {retry(args.batch)} failed jobs")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(batch_results(args.batch), f, indent=4)
+        print(f"Batch {args.batch} saved as {args.output}")
+
+if __name__ == "__main__":
+    main()
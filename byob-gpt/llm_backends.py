@@ -0,0 +1,103 @@
+import functools
+import threading
+
+import clients
+
+# OpenAI-compatible chat backends for the pipeline's LLM stages. "openai" is
+# the hosted API; "local" is any OpenAI-compatible server, by default the
+# Ollama instance used by financial-data/RAG CLI. Each backend has its own
+# concurrency limit. Requests are sent one conversation each: servers such
+# as vLLM, llama.cpp and Ollama (OLLAMA_NUM_PARALLEL) batch concurrent
+# requests themselves, so concurrency is the batching knob. ROUTES picks the
+# backend for each stage.
+#
+# BACKENDS holds each backend's defaults. The variables named in ENV and
+# ROUTE_ENV override them, read through clients.env() when a backend is
+# first used, so settings in .env apply as well.
+BACKENDS = {
+    "openai": {
+        "concurrency": 32,
+    },
+    "local": {
+        "base_url": "http://localhost:11434/v1",
+        "api_key": "local",
+        "model": "qwen2.5:7b",
+        "concurrency": 4,
+    },
+}
+
+ENV = {
+    "openai": {
+        "concurrency": "BYOB_OPENAI_CONCURRENCY",
+    },
+    "local": {
+        "base_url": "BYOB_LOCAL_LLM_URL",
+        "api_key": "BYOB_LOCAL_LLM_KEY",
+        "model": "BYOB_LOCAL_LLM_MODEL",
+        "concurrency": "BYOB_LOCAL_LLM_CONCURRENCY",
+    },
+}
+
+ROUTE_ENV = {
+    "summarize": "BYOB_SUMMARY_BACKEND",
+}
+
+# Stages routed with configure(), ahead of ROUTE_ENV
+ROUTES = {}
+
+_lock = threading.Lock()
+_backends = {}
+
+
+class Backend:
+    def __init__(self, name, model=None, base_url=None, api_key=None, concurrency=8):
+        """One OpenAI-compatible server; model overrides the model a stage asks for."""
+        self.name = name
+        self.model = model
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.client_name = "openai" if base_url is None else f"llm:{name}"
+
+    def create(self, request):
+        """Send one chat completion request, waiting for a free slot."""
+        with self.slots:
+            return clients.get(self.client_name).chat.completions.create(**request)
+
+
+def settings(name):
+    """BACKENDS[name] with any overrides from the environment or .env."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    config = dict(BACKENDS[name])
+    for key, variable in ENV.get(name, {}).items():
+        value = clients.env(variable)
+        if value is not None:
+            config[key] = type(config[key])(value)
+    return config
+
+def _compatible_client(name):
+    from openai import OpenAI
+    config = settings(name)
+    return OpenAI(base_url=config["base_url"], api_key=config.get("api_key"))
+
+# Clients for the self-hosted backends, built on first use like the hosted one
+for _name, _config in BACKENDS.items():
+    if _config.get("base_url"):
+        clients.register(f"llm:{_name}", functools.partial(_compatible_client, _name))
+
+def get(name):
+    config = settings(name)
+    with _lock:
+        if name not in _backends:
+            _backends[name] = Backend(name, **config)
+        return _backends[name]
+
+def route(stage):
+    name = ROUTES.get(stage)
+    if name is None:
+        name = clients.env(ROUTE_ENV[stage], "openai") if stage in ROUTE_ENV else "openai"
+    return get(name)
+
+def configure(stage, name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    ROUTES[stage] = name
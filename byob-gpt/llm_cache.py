@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import time
+
+import storage
+
+# Chat completion responses keyed on model, messages and decoding parameters.
+# Only temperature-0 requests are cached unless the caller opts in, so runs
+# that sample stay non-deterministic.
+CACHE_PATH = os.path.join(storage.CACHE_DIR, "llm.db")
+ENABLED = os.getenv("BYOB_LLM_CACHE", "1") != "0"
+CACHE_SAMPLED = os.getenv("BYOB_LLM_CACHE_SAMPLED", "0") == "1"
+TTL = int(os.getenv("BYOB_LLM_CACHE_TTL", 7 * 24 * 3600))
+MAX_ENTRIES = int(os.getenv("BYOB_LLM_CACHE_MAX_ENTRIES", 50000))
+
+_counters = {"hits": 0, "misses": 0, "bypassed": 0, "evicted": 0}
+_db = storage.Database(CACHE_PATH, """
+    CREATE TABLE IF NOT EXISTS completions (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed_at);
+""")
+
+
+def request_key(request):
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def is_cacheable(request, cache=None):
+    if not ENABLED or cache is False:
+        return False
+    if cache is True or CACHE_SAMPLED:
+        return True
+    return request.get("temperature") == 0
+
+def get(key):
+    with _db.lock:
+        conn = _db.connect()
+        row = conn.execute("SELECT content, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > TTL:
+            if row is not None:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                conn.commit()
+            _counters["misses"] += 1
+            return None
+        conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        _counters["hits"] += 1
+        return row[0]
+
+def put(key, model, content):
+    with _db.lock:
+        conn = _db.connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO completions (key, model, content, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, model, content, now, now),
+        )
+        count = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        if count > MAX_ENTRIES:
+            overflow = count - MAX_ENTRIES
+            conn.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            _counters["evicted"] += overflow
+        conn.commit()
+
+def complete(create, cache=None, **request):
+    """Run a chat completion through the cache and return the message content.
+
+    create is the function that actually calls the API, normally
+    client.chat.completions.create.
+    """
+    if not is_cacheable(request, cache):
+        with _db.lock:
+            _counters["bypassed"] += 1
+        response = create(**request)
+        return response.choices[0].message.content if response.choices else None
+
+    key = request_key(request)
+    content = get(key)
+    if content is not None:
+        return content
+
+    response = create(**request)
+    content = response.choices[0].message.content if response.choices else None
+    if content and content.strip():
+        put(key, request["model"], content)
+    return content
+
+def stats():
+    with _db.lock:
+        stats = dict(_counters)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+def purge_expired():
+    with _db.lock:
+        conn = _db.connect()
+        conn.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - TTL,))
+        conn.commit()
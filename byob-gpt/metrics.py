@@ -0,0 +1,151 @@
+import contextvars
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Per-stage counters for the byob pipeline, labelled with the brand, pillar
+# and parameter being scored. Stage seconds are summed over calls, so
+# concurrent calls can add up to more than the wall-clock time; the "total"
+# stage holds each parameter's own wall time.
+STAGES = ("search", "fetch", "parse", "summarize", "provisional", "rag", "extract", "fused", "total")
+FIELDS = ("calls", "seconds", "bytes", "prompt_tokens", "completion_tokens", "cost_usd")
+
+# USD per million tokens (input, output) and per Google CSE query
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+CSE_QUERY_PRICE = 0.005
+
+_lock = threading.Lock()
+_stage = contextvars.ContextVar("byob_stage", default=None)
+_labels = contextvars.ContextVar("byob_labels", default=("", "", ""))
+
+
+def _new_record():
+    return dict.fromkeys(FIELDS, 0)
+
+# (brand, pillar, parameter, stage) -> counters
+_records = defaultdict(_new_record)
+
+
+def _add(stage, **values):
+    key = (*_labels.get(), stage)
+    with _lock:
+        record = _records[key]
+        for field, value in values.items():
+            record[field] += value
+
+@contextmanager
+def labelled(brand, pillar, parameter):
+    token = _labels.set((brand, pillar, parameter))
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+@contextmanager
+def timed(stage):
+    token = _stage.set(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+        _add(stage, calls=1, seconds=time.perf_counter() - start)
+
+def propagate(fn):
+    """Wrap fn so worker threads see the caller's labels and stage."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+def current_stage():
+    return _stage.get() or "other"
+
+def record_usage(usage, model=None):
+    # usage is the OpenAI response.usage object, or None for cached responses
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    _add(
+        current_stage(),
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=(prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000,
+    )
+
+def record_bytes(count):
+    _add(current_stage(), bytes=count)
+
+def record_search_query():
+    _add(current_stage(), cost_usd=CSE_QUERY_PRICE)
+
+def record_wall(seconds):
+    _add("total", calls=1, seconds=seconds)
+
+def _rounded(record):
+    return {field: round(value, 6) if isinstance(value, float) else value for field, value in record.items()}
+
+def _sum_into(target, record):
+    for field in FIELDS:
+        target[field] += record[field]
+
+def snapshot():
+    """Counters summed per stage across every brand and parameter."""
+    stages = defaultdict(_new_record)
+    with _lock:
+        for (_, _, _, stage), record in _records.items():
+            _sum_into(stages[stage], record)
+    return {stage: _rounded(record) for stage, record in stages.items()}
+
+def report():
+    """Counters per stage, per parameter and per brand."""
+    parameters = {}
+    brands = defaultdict(_new_record)
+    with _lock:
+        for (brand, pillar, parameter, stage), record in _records.items():
+            stages = parameters.setdefault(brand, {}).setdefault(pillar, {}).setdefault(parameter, {})
+            stages[stage] = _rounded(record)
+            if stage != "total":
+                _sum_into(brands[brand], record)
+    return {
+        "stages": snapshot(),
+        "brands": {brand: _rounded(record) for brand, record in brands.items()},
+        "parameters": parameters,
+    }
+
+def reset():
+    with _lock:
+        _records.clear()
+
+def write_json(path):
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=4)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def write_prometheus(path):
+    """Write the counters in the Prometheus text exposition format."""
+    with _lock:
+        records = dict(_records)
+    lines = []
+    for field in FIELDS:
+        name = f"byob_stage_{field}_total"
+        lines.append(f"# HELP {name} byob pipeline {field.replace('_', ' ')} per stage")
+        lines.append(f"# TYPE {name} counter")
+        for (brand, pillar, parameter, stage), record in sorted(records.items()):
+            labels = (
+                f'brand="{_escape(brand)}",pillar="{_escape(pillar)}",'
+                f'parameter="{_escape(parameter)}",stage="{_escape(stage)}"'
+            )
+            lines.append(f"{name}{{{labels}}} {record[field]}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
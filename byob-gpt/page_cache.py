@@ -0,0 +1,132 @@
+import hashlib
+import os
+import time
+
+import storage
+
+# Extracted page text is stored once per distinct content under its sha256,
+# with a SQLite index mapping each URL to its blob and HTTP validators.
+CACHE_DIR = os.path.join(storage.CACHE_DIR, "pages")
+ENABLED = os.getenv("BYOB_PAGE_CACHE", "1") != "0"
+FRESH_FOR = int(os.getenv("BYOB_PAGE_CACHE_FRESH_FOR", 6 * 3600))
+MAX_BYTES = int(os.getenv("BYOB_PAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+_db = storage.Database(os.path.join(CACHE_DIR, "index.db"), """
+    CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+""")
+
+
+def _blob_path(digest):
+    return os.path.join(CACHE_DIR, digest[:2], f"{digest}.txt")
+
+def lookup(url):
+    if not ENABLED:
+        return None
+    with _db.lock:
+        conn = _db.connect()
+        row = conn.execute(
+            "SELECT digest, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        digest, etag, last_modified, fetched_at = row
+        try:
+            with open(_blob_path(digest), encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        conn.commit()
+    return {"text": text, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+
+def is_fresh(entry):
+    return time.time() - entry["fetched_at"] < FRESH_FOR
+
+def conditional_headers(entry):
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def touch(url):
+    # A 304 revalidation restarts the freshness window without rewriting the blob
+    if not ENABLED:
+        return
+    with _db.lock:
+        now = time.time()
+        conn = _db.connect()
+        conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+        conn.commit()
+
+def store(url, text, etag=None, last_modified=None):
+    if not ENABLED:
+        return
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    with _db.lock:
+        conn = _db.connect()
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        previous = conn.execute("SELECT digest FROM pages WHERE url = ?", (url,)).fetchone()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO pages (url, digest, size, etag, last_modified, fetched_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, digest, len(data), etag, last_modified, now, now),
+        )
+        if previous and previous[0] != digest:
+            _drop_blob_if_unused(conn, previous[0])
+        _evict(conn)
+        conn.commit()
+
+def _drop_blob_if_unused(conn, digest):
+    if conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+        try:
+            os.remove(_blob_path(digest))
+        except OSError:
+            pass
+
+def _evict(conn):
+    # Blobs shared by several URLs are counted once, matching what is on disk
+    total = conn.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM pages GROUP BY digest)"
+    ).fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+    for url, digest in conn.execute("SELECT url, digest FROM pages ORDER BY accessed_at").fetchall():
+        conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        if conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            size = os.path.getsize(_blob_path(digest)) if os.path.exists(_blob_path(digest)) else 0
+            _drop_blob_if_unused(conn, digest)
+            total -= size
+        if total <= MAX_BYTES:
+            break
+
+def clear():
+    with _db.lock:
+        conn = _db.connect()
+        for (digest,) in conn.execute("SELECT DISTINCT digest FROM pages").fetchall():
+            try:
+                os.remove(_blob_path(digest))
+            except OSError:
+                pass
+        conn.execute("DELETE FROM pages")
+        conn.commit()
@@ -0,0 +1,16 @@
+import re
+
+# The one parser for numbers in LLM extractions, which come back as numbers,
+# "1,200 dealers", "45%" or prose. Shared by the results store, the scorer
+# and the pipeline's agreement check so they read a value the same way.
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def to_number(value):
+    """The first number in value as a float, or None if it has none."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
@@ -0,0 +1,776 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from urllib.parse import urlsplit
+import json
+import re
+from chunking import RANK_UNIT_TOKENS, chunk_content, count_tokens
+import clients
+from html_text import decode_html, extract_text
+import llm_backends
+import llm_cache
+import metrics
+import page_cache
+from parsing import to_number
+import query_planner
+import dedup
+import domain_health
+import ranking
+import rate_limit
+import replay
+import search_cache
+
+# Configuration
+MAX_CONTENT_LENGTH = 50000
+MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+SEARCH_DEPTH = 5
+PARAMETER_WORKERS = 5
+FETCH_WORKERS = 8
+FETCH_POOL_SIZE = 32
+MAX_CONNECTIONS_PER_HOST = 2
+SUMMARY_WORKERS = 6
+REDUCE_FANIN = 2
+
+# Hosted models: chunk summaries and provisional values on the cheap one,
+# RAG, extraction and fused calls on the stronger one
+SUMMARY_MODEL = "gpt-4o-mini"
+EXTRACTION_MODEL = "gpt-4o"
+
+# Keep-alive pool shared by every fetch; hosts are capped separately below
+def _http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Mozilla/5.0'})
+    adapter = HTTPAdapter(pool_connections=FETCH_POOL_SIZE, pool_maxsize=FETCH_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+clients.register("http", _http_session)
+
+_host_slots = defaultdict(lambda: threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST))
+_host_slots_lock = threading.Lock()
+
+# httplib2 transports are not thread-safe, so each worker thread gets its own
+_thread_local = threading.local()
+
+DEFAULT_SUMMARY_PROMPT = (
+    "You are an AI assistant summarizing content relevant to '{search_term}' for India only. "
+    "If context is available, use it. Provide a summary under 500 tokens, focusing on key insights."
+)
+
+DEFAULT_RAG_PROMPT = (
+    "Based on the search results, extract data related to **'{search_term}'** for **India only**. "
+    "Present it in a structured format with source citations. Ignore irrelevant or global data."
+)
+
+MERGE_PROMPT = (
+    "You are an AI assistant merging partial summaries about '{search_term}' for India only. "
+    "Combine them into one summary under 500 tokens, keeping every figure and its source."
+)
+
+SUMMARY_MODES = ("sequential", "map_reduce")
+EXECUTORS = ("threads", "dag")
+DEDUP_SCOPES = ("run", "parameter", None)
+AUDIT_KEYS = ("Ranking", "Provisional value")
+
+DEFAULT_OPTIONS = {
+    "parameter_workers": PARAMETER_WORKERS,
+    "summary_mode": "sequential",
+    # Only the chunk_top_k most relevant passages of each page (RANK_UNIT_TOKENS
+    # each) are summarized; 0 or None sends the whole page. What is kept fits
+    # one summary chunk, so summary_mode only matters with ranking off
+    "chunk_top_k": 6,
+    # One structured gpt-4o call per pillar instead of RAG + extract per parameter
+    "fused": False,
+    # Pass a dict here to collect each parameter's query, results and RAG response
+    "trace": None,
+    # Near-duplicate pages are summarized once per "parameter", once per "run"
+    # (every parameter sharing the index in "duplicates"), or never (None).
+    # "run" is opt-in: a shared page keeps the summary written for whichever
+    # parameter claimed it first, with that parameter's query and prompt
+    "dedup": "parameter",
+    "duplicates": None,
+    # Process results in rank order and stop once agreement_sources of them
+    # give values within agreement_tolerance of each other
+    "adaptive": False,
+    "agreement_sources": 2,
+    "agreement_tolerance": 0.1,
+    # "threads" runs each stage for all of a parameter's pages before the next;
+    # "dag" streams pages through the stages with bounded queues (dag.py)
+    "executor": "threads",
+    # Search each pillar with a few broad queries and share the results out
+    # between its parameters (query_planner.py) instead of one query per parameter
+    "plan_queries": False,
+    # Filled in by run_pillar when plan_queries is set
+    "search_plan": None,
+}
+
+
+def _search_http():
+    if not hasattr(_thread_local, "http"):
+        import httplib2
+        _thread_local.http = httplib2.Http(timeout=10)
+    return _thread_local.http
+
+# Every external call goes through these three functions, so replay.py can
+# record or stand in for them and metrics.py can attribute their cost
+def _chat_create(**request):
+    def live():
+        rate_limit.acquire("openai")
+        return llm_backends.get("openai").create(request)
+
+    response = replay.chat_create(request, live)
+    metrics.record_usage(getattr(response, "usage", None), request.get("model"))
+    return response
+
+def summary_model():
+    return llm_backends.route("summarize").model or SUMMARY_MODEL
+
+def _backend_create(backend):
+    # _chat_create for a stage routed to another llm_backends backend
+    if backend.name == "openai":
+        return _chat_create
+
+    def create(**request):
+        response = replay.chat_create(request, lambda: backend.create(request))
+        metrics.record_usage(getattr(response, "usage", None), request.get("model"))
+        return response
+    return create
+
+def _cse_list(query, num=SEARCH_DEPTH):
+    def live():
+        rate_limit.acquire("google_cse")
+        return clients.get("customsearch").cse().list(
+            q=query, cx=clients.env('SEARCH_ENGINE_ID'), num=num
+        ).execute(http=_search_http())
+
+    metrics.record_search_query()
+    return replay.cse_list(query, live)
+
+def _http_get(url, headers, timeout=domain_health.DEFAULT_TIMEOUT):
+    return replay.http_get(url, lambda: clients.get("http").get(url, headers=headers, timeout=timeout, stream=True))
+
+def _host_slot(url):
+    host = urlsplit(url).netloc.lower()
+    with _host_slots_lock:
+        return _host_slots[host]
+
+# Step 1: Perform Google Search
+def parameter_query(company_name, parameter):
+    return f'{company_name} {parameter} India after:2025-01-01'
+
+def search_items(query, num=SEARCH_DEPTH):
+    try:
+        with metrics.timed("search"):
+            res = search_cache.cached_search(
+                "google_cse", query, lambda: _cse_list(query, num),
+                params={"cx": clients.env('SEARCH_ENGINE_ID'), "num": num},
+            )
+        items = res.get("items", [])
+        if not items:
+            print("No results found")
+            return None
+        print(f"Found {len(items)} search results")
+        return items
+    except Exception as e:
+        print(f"Error performing search: {e}")
+        return None
+
+def perform_search(company_name, parameter):
+    query = parameter_query(company_name, parameter)
+    items = search_items(query)
+    return (items, query) if items else None
+
+# Step 2: Retrieve Web Content
+def _read_capped(response):
+    # Decide from the headers before reading, then stop once the byte budget is spent
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        print(f"Skipping {response.url}: content type {content_type}")
+        return None
+    if int(response.headers.get('Content-Length') or 0) > MAX_DOWNLOAD_BYTES:
+        print(f"Skipping {response.url}: larger than {MAX_DOWNLOAD_BYTES} bytes")
+        return None
+
+    data = bytearray()
+    for block in response.iter_content(chunk_size=64 * 1024):
+        data.extend(block)
+        if len(data) > MAX_DOWNLOAD_BYTES:
+            print(f"Skipping {response.url}: larger than {MAX_DOWNLOAD_BYTES} bytes")
+            return None
+    return bytes(data)
+
+# Downloading and parsing are separate steps so the stage-pipelined executor
+# (dag.py) can run them in separate stages; retrieve_content does both
+def download(url):
+    """Fetch url, or serve it from the page cache.
+
+    Returns {"text": ...} when the cached text can be used, the raw
+    download as {"data", "headers", "seconds"} otherwise, or None when the
+    page was skipped or failed.
+    """
+    cached = page_cache.lookup(url)
+    if cached and page_cache.is_fresh(cached):
+        print(f"Using cached content for {url}")
+        return {"text": cached["text"]}
+
+    allowed, reason = domain_health.allow(url)
+    if not allowed:
+        if cached:
+            print(f"Using stale cached content for {url}: {reason}")
+            return {"text": cached["text"]}
+        print(f"Skipping {url}: {reason}")
+        return None
+
+    try:
+        return _fetch(url, cached)
+    finally:
+        # A trial fetch ends here even if its page is never parsed, say when its pillar fails
+        domain_health.release(url)
+
+def _fetch(url, cached):
+    print(f"Retrieving content from: {url}")
+    start = time.perf_counter()
+    try:
+        with metrics.timed("fetch"), _host_slot(url):
+            # Domain latency starts once a host slot is free, not while queued for one
+            start = time.perf_counter()
+            response = _http_get(url, page_cache.conditional_headers(cached), domain_health.timeout(url))
+            with response:
+                if cached and response.status_code == 304:
+                    domain_health.record(url, True, time.perf_counter() - start)
+                    page_cache.touch(url)
+                    print(f"Cached content for {url} is still valid")
+                    return {"text": cached["text"]}
+                response.raise_for_status()
+                data = _read_capped(response)
+                if data:
+                    metrics.record_bytes(len(data))
+    except Exception as e:
+        if domain_health.is_domain_failure(e):
+            domain_health.record(url, False, time.perf_counter() - start, domain_health.failure_reason(e))
+        else:
+            # The domain answered; the page itself is gone or broken
+            domain_health.record(url, True, time.perf_counter() - start)
+        print(f"Failed to retrieve {url}: {e}")
+        return None
+
+    if data is None:
+        # Wrong content type or too large: a page problem, not a domain one
+        domain_health.record(url, True, time.perf_counter() - start)
+        return None
+    return {"data": data, "headers": response.headers, "seconds": time.perf_counter() - start}
+
+def parse_download(url, downloaded):
+    """Text of a download() result, or None."""
+    if downloaded is None:
+        return None
+    if "text" in downloaded:
+        return downloaded["text"]
+
+    headers, seconds = downloaded["headers"], downloaded["seconds"]
+    try:
+        with metrics.timed("parse"):
+            text = extract_text(decode_html(downloaded["data"], headers.get('Content-Type')), MAX_CONTENT_LENGTH)
+        if text is None:
+            domain_health.record(url, True, seconds)
+            print(f"Skipping {url}: text longer than {MAX_CONTENT_LENGTH} characters")
+            return None
+        if domain_health.is_bot_wall(text):
+            domain_health.record(url, False, seconds, "bot wall")
+            print(f"Skipping {url}: bot wall")
+            return None
+
+        page_cache.store(url, text, headers.get('ETag'), headers.get('Last-Modified'))
+        domain_health.record(url, True, seconds)
+        print(f"Retrieved content from {url}, length: {len(text)})")
+        return text
+    except Exception as e:
+        # A page the parser cannot handle is no sign the domain is failing
+        domain_health.record(url, True, seconds)
+        print(f"Failed to retrieve {url}: {e}")
+        return None
+
+def retrieve_content(url):
+    return parse_download(url, download(url))
+
+def fetch_all(urls):
+    # Pages download concurrently; results come back in the order of urls
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls))) as executor:
+        return list(executor.map(metrics.propagate(retrieve_content), urls))
+
+# Step 3: Summarize Content (chunks come from chunking.chunk_content)
+def summarize_chunk(chunk, search_term, context=None, summary_prompt=DEFAULT_SUMMARY_PROMPT):
+    print(f"Summarizing chunk of size: {count_tokens(chunk)} tokens")
+    prompt = summary_prompt.format(search_term=search_term)
+
+    messages = [{"role": "system", "content": prompt}]
+    if context:
+        messages.append({"role": "assistant", "content": context})
+    messages.append({"role": "user", "content": chunk})
+
+    backend = llm_backends.route("summarize")
+    try:
+        with metrics.timed("summarize"):
+            summary = llm_cache.complete(
+                _backend_create(backend),
+                model=backend.model or SUMMARY_MODEL,
+                messages=messages,
+                max_tokens=500
+            )
+        return summary.strip()
+    except Exception as e:
+        print(f"Error during summarization: {e}")
+        return "[Error in summarization]"
+
+def summarize_chunks_sequential(chunks, search_term, summary_prompt=DEFAULT_SUMMARY_PROMPT):
+    summaries = []
+    for chunk in chunks:
+        context = summaries[-1] if summaries else None
+        summary = summarize_chunk(chunk, search_term, context, summary_prompt)
+        if summary:
+            summaries.append(summary)
+    return ' '.join(summaries)
+
+def summarize_chunks_map_reduce(chunks, search_term, summary_prompt=DEFAULT_SUMMARY_PROMPT):
+    # Chunks are summarized independently, then partial summaries are merged
+    # REDUCE_FANIN at a time, so round trips grow with log(chunks)
+    chunks = list(chunks)
+    if not chunks:
+        return ''
+
+    def summarize_one(chunk):
+        return summarize_chunk(chunk, search_term, None, summary_prompt)
+
+    def merge(group):
+        if len(group) == 1:
+            return group[0]
+        return summarize_chunk('\n\n'.join(group), search_term, None, MERGE_PROMPT)
+
+    with ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(chunks))) as executor:
+        summaries = [
+            s for s in executor.map(metrics.propagate(summarize_one), chunks)
+            if s and s != "[Error in summarization]"
+        ]
+        while len(summaries) > 1:
+            groups = [summaries[i:i + REDUCE_FANIN] for i in range(0, len(summaries), REDUCE_FANIN)]
+            summaries = list(executor.map(metrics.propagate(merge), groups))
+    return summaries[0] if summaries else "[Error in summarization]"
+
+def summarize_chunks(chunks, search_term, summary_prompt=DEFAULT_SUMMARY_PROMPT, mode="sequential"):
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"Unknown summary mode: {mode}")
+    if mode == "map_reduce":
+        return summarize_chunks_map_reduce(chunks, search_term, summary_prompt)
+    return summarize_chunks_sequential(chunks, search_term, summary_prompt)
+
+def summarize_content(content, search_term, summary_prompt=DEFAULT_SUMMARY_PROMPT, mode="sequential"):
+    return summarize_chunks(chunk_content(content), search_term, summary_prompt, mode)
+
+# Step 4: Get Search Results with Summarization
+def summarize_page(result, web_content, search_term, summary_prompt, summary_mode, chunk_top_k):
+    if chunk_top_k:
+        # Most pages fit in one summary chunk, so ranking whole chunks would
+        # rarely drop anything; passages are ranked and the kept ones rejoined
+        passages = list(chunk_content(web_content, RANK_UNIT_TOKENS, 0))
+        if len(passages) > chunk_top_k:
+            kept, result['Ranking'] = ranking.select_chunks(passages, search_term, chunk_top_k)
+            print(f"Kept passages {result['Ranking']['kept']} of {len(passages)} from {result['link']} by relevance")
+            web_content = '\n\n'.join(kept)
+    return summarize_chunks(chunk_content(web_content), search_term, summary_prompt, summary_mode)
+
+def get_search_results_with_fallback(search_items, search_term, summary_prompt=DEFAULT_SUMMARY_PROMPT,
+                                     summary_mode="sequential", chunk_top_k=None, duplicates=None, stop=None):
+    # stop, if given, sees each result as soon as it is summarized; pages are
+    # then fetched one at a time, and a true return ends the loop early
+    results_list = []
+    claims = dedup.Claims(duplicates) if duplicates is not None else None
+    urls = [item.get('link') for item in search_items]
+    pages = fetch_all(urls) if stop is None else map(retrieve_content, urls)
+    try:
+        for idx, (item, web_content) in enumerate(zip(search_items, pages), start=1):
+            url = item.get('link')
+            snippet = item.get('snippet', '')
+            result = {'order': idx, 'link': url, 'title': snippet}
+            if web_content is None:
+                print(f"Error: skipped URL: {url}")
+                result['Summary'] = f"[Fallback summary] {snippet or 'No snippet available.'}"
+                results_list.append(result)
+                if stop is not None and stop(result):
+                    break
+                continue
+
+            entry = None
+            if claims is not None:
+                entry, role = claims.claim(dedup.simhash(web_content), result)
+                if role == "shared":
+                    results_list.append(result)
+                if role != "new":
+                    continue
+
+            result['Summary'] = summarize_page(
+                result, web_content, search_term, summary_prompt, summary_mode, chunk_top_k
+            )
+            if entry is not None:
+                claims.summarized(entry, result['Summary'])
+            results_list.append(result)
+            # Copies of another parameter's page are not independent sources, so
+            # only pages summarized here count towards agreement
+            if stop is not None and stop(result):
+                break
+    finally:
+        if claims is not None:
+            claims.release()
+
+    if claims is not None:
+        claims.collect_shared()
+    print(f"Processed {len(results_list)} search results")
+    return results_list
+
+def _rag_view(search_results):
+    # Audit fields such as chunk ranking stay out of the prompt
+    return [{key: value for key, value in result.items() if key not in AUDIT_KEYS} for result in search_results]
+
+# Step 5: Generate RAG Response
+def generate_rag_response(search_results, search_query, search_term, rag_prompt=DEFAULT_RAG_PROMPT):
+    final_prompt = rag_prompt.format(search_term=search_term, search_query=search_query)
+
+    try:
+        with metrics.timed("rag"):
+            return llm_cache.complete(
+                _chat_create,
+                model=EXTRACTION_MODEL,
+                messages=[
+                    {"role": "system", "content": final_prompt},
+                    {"role": "user", "content": json.dumps(_rag_view(search_results), indent=4)}
+                ],
+                temperature=0
+            )
+    except Exception as e:
+        print(f"Error generating RAG response: {e}")
+        return None
+
+# Step 6: Extract Parameters
+def extract_parameters(final_prompt, rag_response, search_term, strip_thousands=False):
+    try:
+        with metrics.timed("extract"):
+            raw_response = llm_cache.complete(
+                _chat_create,
+                model=EXTRACTION_MODEL,
+                messages=[
+                    {"role": "system", "content": final_prompt},
+                    {"role": "user", "content": rag_response}
+                ],
+                temperature=0
+            )
+
+        if not raw_response or not raw_response.strip():
+            raise ValueError(f"Empty response received from GPT for {search_term}")
+
+        raw_response = raw_response.strip()
+        cleaned_response = re.sub(r"```json\s*(.*?)\s*```", r"\1", raw_response, flags=re.DOTALL)
+        if strip_thousands:
+            cleaned_response = re.sub(r'(\d+),(\d+)', r'\1\2', cleaned_response)
+
+        try:
+            return json.loads(cleaned_response)
+        except json.JSONDecodeError as e:
+            print(f"JSON Decode Error for {search_term}: {e}")
+            print(f"Cleaned response received: {cleaned_response}")
+            return None
+    except Exception as e:
+        print(f"Error extracting {search_term}: {e}")
+        return None
+
+# Step 7 (fused mode): RAG and extraction for a whole pillar in one structured call
+FUSED_PROMPT = (
+    "You are given summarized search results for several {pillar} parameters of a brand, grouped by parameter. "
+    "For each parameter, extract a single numerical or categorical value that applies to **India only**, "
+    "ignoring global or irrelevant data. If several values exist, give a weighted or reasonable average. "
+    "List the links of the sources you used as citations, and use null when the results hold no usable value."
+)
+
+# Pillars whose parameters feed a score set PILLAR["value_types"] to ["number", "null"].
+# The fused schema then allows only those, and run_pillar converts the
+# values every other path extracts, such as "85%" or "4.2/5", to numbers.
+VALUE_TYPES = ["number", "string", "null"]
+
+def _fused_schema(pillar):
+    parameter_schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["value", "citations"],
+        "properties": {
+            "value": {"type": pillar.get("value_types", VALUE_TYPES)},
+            "citations": {"type": "array", "items": {"type": "string"}},
+        },
+    }
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": f"{pillar['name']}_parameters",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": list(pillar["parameters"]),
+                "properties": {parameter: parameter_schema for parameter in pillar["parameters"]},
+            },
+        },
+    }
+
+def generate_fused_response(evidence, pillar):
+    final_prompt = FUSED_PROMPT.format(pillar=pillar["name"])
+    if pillar.get("extract_guidance"):
+        final_prompt += "\n" + pillar["extract_guidance"]
+
+    try:
+        with metrics.timed("fused"):
+            raw_response = llm_cache.complete(
+                _chat_create,
+                model=EXTRACTION_MODEL,
+                messages=[
+                    {"role": "system", "content": final_prompt},
+                    {"role": "user", "content": json.dumps(evidence, indent=4)}
+                ],
+                response_format=_fused_schema(pillar),
+                temperature=0
+            )
+        return json.loads(raw_response)
+    except Exception as e:
+        print(f"Error generating fused {pillar['name']} response: {e}")
+        return None
+
+# Step 4b (adaptive mode): a provisional value per result, to stop once sources agree
+PROVISIONAL_PROMPT = (
+    "From the summary below, extract the value of '{parameter}' for **India only** as a single number "
+    "or a short category. Use null when the summary holds no usable value."
+)
+
+PROVISIONAL_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "provisional_value",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["value"],
+            "properties": {"value": {"type": ["number", "string", "null"]}},
+        },
+    },
+}
+
+def extract_provisional(summary, parameter):
+    try:
+        with metrics.timed("provisional"):
+            raw_response = llm_cache.complete(
+                _chat_create,
+                model=SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": PROVISIONAL_PROMPT.format(parameter=parameter)},
+                    {"role": "user", "content": summary}
+                ],
+                response_format=PROVISIONAL_SCHEMA,
+                max_tokens=100,
+                temperature=0
+            )
+        return json.loads(raw_response).get("value")
+    except Exception as e:
+        print(f"Error extracting a provisional {parameter}: {e}")
+        return None
+
+def sources_agree(values, min_sources=2, tolerance=0.1):
+    """True once min_sources values agree: numbers within tolerance of one of them, or equal categories."""
+    numbers, categories = [], []
+    for value in values:
+        if value is None or isinstance(value, bool):
+            continue
+        number = to_number(value)
+        if number is not None:
+            numbers.append(number)
+        elif str(value).strip():
+            categories.append(str(value).strip().lower())
+    for anchor in numbers:
+        if sum(1 for n in numbers if abs(n - anchor) <= tolerance * abs(anchor)) >= min_sources:
+            return True
+    return any(categories.count(category) >= min_sources for category in set(categories))
+
+def _agreement_stop(parameter, options, record):
+    # Fills record with the provisional values seen and why the loop ended
+    record.update({"reason": "exhausted", "values": []})
+
+    def stop(result):
+        # Kept on the result too, so stored runs have each source's value
+        result['Provisional value'] = extract_provisional(result['Summary'], parameter)
+        record["values"].append(result['Provisional value'])
+        if sources_agree(record["values"], options["agreement_sources"], options["agreement_tolerance"]):
+            record["reason"] = "agreement"
+            record["tolerance"] = options["agreement_tolerance"]
+            return True
+        return False
+    return stop
+
+def _labelled_parameter(fn):
+    # Runs fn under the parameter's metrics labels and records its wall time
+    def run(company_name, parameter, pillar, options):
+        with metrics.labelled(company_name, pillar["name"], parameter):
+            start = time.perf_counter()
+            try:
+                return fn(company_name, parameter, pillar, options)
+            finally:
+                metrics.record_wall(time.perf_counter() - start)
+    return run
+
+# Search, fetch and summarize one parameter's results
+def _gather_parameter(company_name, parameter, pillar, options):
+    print(f"\n🔍 Searching for {parameter} data on {company_name}...\n")
+    search = planned_search(company_name, parameter, options)
+    if not search:
+        print(f"No search results found for {parameter}. Skipping...")
+        return None
+    search_results, refined_query = search
+
+    if options["dedup"] == "run":
+        duplicates = options["duplicates"]
+    else:
+        duplicates = dedup.DuplicateIndex() if options["dedup"] else None
+
+    stopping = {}
+    stop = _agreement_stop(parameter, options, stopping) if options["adaptive"] else None
+
+    print(f"\n Extracting data from search results for {parameter}...\n")
+    summarized_results = get_search_results_with_fallback(
+        search_results, refined_query, pillar["summary_prompt"], options["summary_mode"], options["chunk_top_k"],
+        duplicates, stop,
+    )
+    if stop is not None:
+        stopping["processed"] = len(stopping["values"])
+        stopping["available"] = len(search_results)
+        print(f"Stopped {parameter} after {stopping['processed']} of {len(search_results)} results: {stopping['reason']}")
+    if options["trace"] is not None:
+        options["trace"][parameter] = {"query": refined_query, "results": summarized_results}
+        if stop is not None:
+            options["trace"][parameter]["stopping"] = stopping
+    return refined_query, summarized_results
+
+gather_parameter = _labelled_parameter(_gather_parameter)
+
+# Run one parameter through search -> fetch -> summarize -> RAG -> extract
+def _run_parameter(company_name, parameter, pillar, options):
+    gathered = _gather_parameter(company_name, parameter, pillar, options)
+    if not gathered:
+        return None
+    refined_query, summarized_results = gathered
+
+    print(f"\n Generating RAG response for {parameter}...\n")
+    rag_response = generate_rag_response(summarized_results, refined_query, parameter, pillar["rag_prompt"])
+    if options["trace"] is not None:
+        options["trace"][parameter]["rag_response"] = rag_response
+    if not rag_response:
+        print(f"Failed to generate a RAG response for {parameter}. Skipping...")
+        return None
+
+    print(f"\n Extracting {pillar['name']} parameters for {parameter}...\n")
+    extracted_params = pillar["extract"](rag_response, parameter)
+    if not extracted_params:
+        print(f"Failed to extract data for {parameter}. Skipping...")
+        return None
+    return extracted_params
+
+run_parameter = _labelled_parameter(_run_parameter)
+
+def _map_parameters(fn, company_name, pillar, options):
+    parameters = pillar["parameters"]
+    workers = max(1, min(options["parameter_workers"], len(parameters)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(fn, company_name, parameter, pillar, options)
+            for parameter in parameters
+        ]
+        return [future.result() for future in futures]
+
+def _run_pillar_fused(company_name, pillar, options):
+    return fuse_gathered(company_name, pillar, options, _map_parameters(gather_parameter, company_name, pillar, options))
+
+# gathered holds each parameter's (query, results) in declaration order, or None
+def fuse_gathered(company_name, pillar, options, gathered):
+    evidence = {
+        parameter: {"query": result[0], "results": _rag_view(result[1])}
+        for parameter, result in zip(pillar["parameters"], gathered) if result
+    }
+    if not evidence:
+        return {}
+
+    print(f"\n Extracting all {pillar['name']} parameters in one call...\n")
+    with metrics.labelled(company_name, pillar["name"], ""):
+        response = generate_fused_response(evidence, pillar)
+    if not response:
+        return {}
+
+    all_results = {}
+    for parameter in pillar["parameters"]:
+        entry = response.get(parameter) or {}
+        if options["trace"] is not None and parameter in options["trace"]:
+            options["trace"][parameter]["citations"] = entry.get("citations", [])
+        if parameter in evidence and entry.get("value") is not None:
+            all_results[parameter] = entry["value"]
+    return all_results
+
+def planned_search(company_name, parameter, options):
+    if options["search_plan"] is not None:
+        return options["search_plan"][parameter]
+    return perform_search(company_name, parameter)
+
+# Run every parameter of a pillar concurrently and merge them in declaration order
+def run_pillar(company_name, pillar, **overrides):
+    # Pillars may pin their own defaults in PILLAR["options"]; callers override both
+    options = {**DEFAULT_OPTIONS, **pillar.get("options", {}), **overrides}
+    if options["summary_mode"] not in SUMMARY_MODES:
+        raise ValueError(f"Unknown summary mode: {options['summary_mode']}")
+    if options["dedup"] not in DEDUP_SCOPES:
+        raise ValueError(f"Unknown dedup scope: {options['dedup']}")
+    if options["dedup"] == "run" and options["duplicates"] is None:
+        options["duplicates"] = dedup.DuplicateIndex()
+    if options["executor"] not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {options['executor']}")
+    if options["plan_queries"]:
+        with metrics.labelled(company_name, pillar["name"], ""):
+            options["search_plan"] = query_planner.plan_pillar(
+                company_name, pillar["parameters"], search_items, parameter_query, SEARCH_DEPTH
+            )
+
+    if options["executor"] == "dag":
+        if options["adaptive"]:
+            raise ValueError("Adaptive mode reads results one at a time; use the threads executor")
+        import dag
+        return typed_values(pillar, dag.run_pillar(company_name, pillar, options))
+
+    if options["fused"]:
+        return typed_values(pillar, _run_pillar_fused(company_name, pillar, options))
+
+    all_results = {}
+    for extracted_params in _map_parameters(run_parameter, company_name, pillar, options):
+        if extracted_params:
+            all_results.update(extracted_params)
+    return typed_values(pillar, all_results)
+
+def typed_values(pillar, all_results):
+    """all_results with values converted to numbers when the pillar only takes numbers."""
+    if "string" in pillar.get("value_types", VALUE_TYPES):
+        return all_results
+    numbers = {}
+    for parameter, value in all_results.items():
+        number = to_number(value)
+        if number is None:
+            print(f"No number in the {parameter} value {value!r}; leaving it out")
+            continue
+        numbers[parameter] = number
+    return numbers
@@ -0,0 +1,88 @@
+import re
+import threading
+
+import ranking
+
+# Instead of one CSE query per parameter, a pillar's parameters are searched
+# GROUP_SIZE at a time with one broader OR query of POOL_SIZE results. Each
+# parameter then takes the pooled results that BM25 ranks most relevant to
+# its own terms, from their titles and snippets. The brand and "India" are
+# left out of that ranking, since every pooled result mentions them. A
+# parameter with fewer than MIN_MATCHES relevant results falls back to its
+# own query.
+GROUP_SIZE = 3
+POOL_SIZE = 10
+MIN_MATCHES = 2
+DATE_FILTER = "after:2025-01-01"
+
+_lock = threading.Lock()
+_counters = {"parameters": 0, "queries": 0, "fallbacks": 0}
+
+_PARENTHETICAL = re.compile(r"\(([^)]*)\)")
+
+
+def parameter_terms(parameter):
+    # "Customer Satisfaction Index (CSAT)" -> '"Customer Satisfaction Index" OR CSAT'
+    abbreviations = _PARENTHETICAL.findall(parameter)
+    phrase = " ".join(_PARENTHETICAL.sub(" ", parameter).replace("&", " ").split())
+    return " OR ".join([f'"{phrase}"', *abbreviations])
+
+def group_query(company_name, parameters):
+    terms = " OR ".join(parameter_terms(parameter) for parameter in parameters)
+    return f"{company_name} India ({terms}) {DATE_FILTER}"
+
+def _document(item):
+    return f"{item.get('title', '')} {item.get('snippet', '')}"
+
+def fan_out(pool, queries, depth):
+    """Give each query the depth most relevant items of pool, best first."""
+    documents = [_document(item) for item in pool]
+    assigned = {}
+    for key, query in queries.items():
+        scores = ranking.bm25_scores(documents, query)
+        # Ties keep the search engine's order
+        ranked = sorted((i for i in range(len(pool)) if scores[i] > 0), key=lambda i: (-scores[i], i))
+        assigned[key] = [pool[i] for i in ranked[:depth]]
+    return assigned
+
+def plan_pillar(company_name, parameters, search, query_for, depth):
+    """Search results for every parameter: {parameter: (items, query) or None}.
+
+    search(query, num) returns a list of CSE items or None, and
+    query_for(company_name, parameter) is the per-parameter query, which
+    stays the search term the results are summarized against.
+    """
+    queries = {parameter: query_for(company_name, parameter) for parameter in parameters}
+    plan = {}
+    issued = fallbacks = 0
+    for start in range(0, len(parameters), GROUP_SIZE):
+        group = parameters[start:start + GROUP_SIZE]
+        pool, seen = [], set()
+        for item in search(group_query(company_name, group), POOL_SIZE) or []:
+            if item.get('link') not in seen:
+                seen.add(item.get('link'))
+                pool.append(item)
+        issued += 1
+
+        assigned = fan_out(pool, {parameter: parameter_terms(parameter) for parameter in group}, depth)
+        for parameter in group:
+            items = assigned[parameter]
+            if len(items) < MIN_MATCHES:
+                print(f"Only {len(items)} pooled results match {parameter}; searching for it on its own")
+                items = search(queries[parameter], depth)
+                fallbacks += 1
+            plan[parameter] = (items, queries[parameter]) if items else None
+
+    with _lock:
+        _counters["parameters"] += len(parameters)
+        _counters["queries"] += issued
+        _counters["fallbacks"] += fallbacks
+    print(f"Planned {len(parameters)} {company_name} parameters with {issued + fallbacks} searches")
+    return plan
+
+def stats():
+    """Searches made through plans, and how many per-parameter searches they saved."""
+    with _lock:
+        stats = dict(_counters)
+    stats["saved"] = stats["parameters"] - stats["queries"] - stats["fallbacks"]
+    return stats
@@ -0,0 +1,61 @@
+import math
+import re
+from collections import Counter
+
+# Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "was", "were", "with",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Search operators such as after:2025-01-01 or site:x.com say nothing about relevance
+_OPERATOR = re.compile(r"\b\w+:\S+")
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def query_terms(query):
+    return list(dict.fromkeys(tokenize(_OPERATOR.sub(" ", query))))
+
+def bm25_scores(documents, query):
+    terms = query_terms(query)
+    docs = [Counter(tokenize(document)) for document in documents]
+    if not docs or not terms:
+        return [0.0] * len(documents)
+
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+    n = len(docs)
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            df = sum(1 for other in docs if term in other)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+        scores.append(round(score, 4))
+    return scores
+
+def select_chunks(chunks, query, top_k):
+    """Keep the top_k chunks with any query term, in document order.
+
+    Returns the kept chunks and an audit record with every chunk's score.
+    """
+    scores = bm25_scores(chunks, query)
+    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+    keep = [i for i in ranked[:top_k] if scores[i] > 0] or ranked[:1]
+    keep.sort()
+    audit = {
+        "query_terms": query_terms(query),
+        "scores": scores,
+        "kept": keep,
+    }
+    return [chunks[i] for i in keep], audit
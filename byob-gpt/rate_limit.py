@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, per_minute):
+        """Token bucket allowing per_minute calls, with bursts up to the same size."""
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, float(per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Calls per minute for each external API, shared by every brand in a process
+LIMITS = {
+    "openai": int(os.getenv("BYOB_OPENAI_RPM", 500)),
+    "google_cse": int(os.getenv("BYOB_CSE_RPM", 60)),
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(api):
+    with _limiters_lock:
+        if api not in _limiters:
+            _limiters[api] = RateLimiter(LIMITS[api])
+        return _limiters[api]
+
+def acquire(api):
+    if LIMITS.get(api):
+        limiter(api).acquire()
+
+def configure(api, per_minute):
+    with _limiters_lock:
+        LIMITS[api] = per_minute
+        _limiters.pop(api, None)
@@ -0,0 +1,154 @@
+import base64
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from llm_cache import request_key
+
+# Record/replay of every external call the pipeline makes: OpenAI chat
+# completions, Google CSE queries and page downloads. MODE is None for live
+# runs, "record" to capture live calls into a cassette, or "replay" to serve
+# them from one with LATENCY seconds of injected delay per call.
+MODE = None
+KINDS = ("openai", "google_cse", "http")
+LATENCY = {kind: 0.0 for kind in KINDS}
+
+_lock = threading.Lock()
+_cassette = {kind: {} for kind in KINDS}
+_path = None
+_counts = {kind: {"calls": 0, "missing": 0} for kind in KINDS}
+
+
+class MissingInteraction(KeyError):
+    pass
+
+
+class ReplayResponse:
+    def __init__(self, url, status_code, headers, body):
+        """Just enough of requests.Response for retrieve_content."""
+        from requests.structures import CaseInsensitiveDict
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = body
+
+    def iter_content(self, chunk_size=64 * 1024):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def load(path, mode, latency=None):
+    global MODE, _path
+    with _lock:
+        _path = path
+        MODE = mode
+        for kind in KINDS:
+            _cassette[kind] = {}
+            _counts[kind] = {"calls": 0, "missing": 0}
+        if mode == "replay" or (mode == "record" and os.path.exists(path)):
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+            for kind in KINDS:
+                _cassette[kind].update(stored.get(kind, {}))
+        LATENCY.update(latency or {})
+
+def save(path=None):
+    with _lock:
+        with open(path or _path, "w", encoding="utf-8") as f:
+            json.dump(_cassette, f, indent=2)
+
+def counts():
+    with _lock:
+        return {kind: dict(values) for kind, values in _counts.items()}
+
+def _replayed(kind, key):
+    with _lock:
+        _counts[kind]["calls"] += 1
+        entry = _cassette[kind].get(key)
+        if entry is None:
+            _counts[kind]["missing"] += 1
+    if entry is None:
+        raise MissingInteraction(f"No recorded {kind} interaction for {key[:80]}")
+    if LATENCY.get(kind):
+        time.sleep(LATENCY[kind])
+    return entry
+
+def _recorded(kind, key, entry):
+    with _lock:
+        _counts[kind]["calls"] += 1
+        _cassette[kind][key] = entry
+
+def chat_create(request, live):
+    key = request_key(request)
+    if MODE == "replay":
+        entry = _replayed("openai", key)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=entry["content"]))],
+            usage=SimpleNamespace(**entry["usage"]) if entry.get("usage") else None,
+        )
+
+    response = live()
+    if MODE == "record":
+        usage = getattr(response, "usage", None)
+        _recorded("openai", key, {
+            "model": request.get("model"),
+            "content": response.choices[0].message.content if response.choices else None,
+            "usage": {
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+            } if usage else None,
+        })
+    return response
+
+def cse_list(query, live):
+    if MODE == "replay":
+        return _replayed("google_cse", query)
+    response = live()
+    if MODE == "record":
+        _recorded("google_cse", query, response)
+    return response
+
+def http_get(url, live):
+    import requests
+
+    if MODE == "replay":
+        entry = _replayed("http", url)
+        if "error" in entry:
+            raise requests.ConnectionError(entry["error"])
+        return ReplayResponse(url, entry["status"], entry["headers"], base64.b64decode(entry["body"]))
+    if MODE != "record":
+        return live()
+
+    try:
+        with live() as response:
+            body = response.content
+            entry = {
+                "status": response.status_code,
+                # The stored body is already decoded, so its transfer headers no longer apply
+                "headers": {
+                    name: value for name, value in response.headers.items()
+                    if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+                },
+                "body": base64.b64encode(body).decode("ascii"),
+            }
+    except requests.RequestException as e:
+        _recorded("http", url, {"error": str(e)})
+        raise
+    _recorded("http", url, entry)
+    return ReplayResponse(url, entry["status"], entry["headers"], body)
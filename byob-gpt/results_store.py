@@ -0,0 +1,269 @@
+import argparse
+import datetime
+import json
+import os
+import time
+
+from parsing import to_number
+import storage
+
+# Every scored run, kept in one SQLite file: each extracted parameter value
+# with the query, RAG response, models and source pages behind it, and each
+# pillar score. Runs are only ever added, so the history of a value stays
+# queryable after later runs.
+RESULTS_PATH = os.getenv("BYOB_RESULTS_DB", os.path.join(storage.REPO_DIR, "byob_results.db"))
+
+_db = storage.Database(RESULTS_PATH, """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        brand TEXT NOT NULL COLLATE NOCASE,
+        started_at REAL NOT NULL,
+        finished_at REAL NOT NULL,
+        summary_model TEXT,
+        extraction_model TEXT,
+        options TEXT,
+        pillars TEXT,
+        report TEXT
+    );
+    CREATE INDEX IF NOT EXISTS runs_brand ON runs (brand, finished_at);
+
+    CREATE TABLE IF NOT EXISTS scores (
+        run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        pillar TEXT NOT NULL,
+        name TEXT NOT NULL,
+        score REAL
+    );
+    CREATE INDEX IF NOT EXISTS scores_run ON scores (run_id);
+
+    CREATE TABLE IF NOT EXISTS parameter_values (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        brand TEXT NOT NULL COLLATE NOCASE,
+        pillar TEXT NOT NULL,
+        parameter TEXT NOT NULL,
+        value TEXT,
+        numeric REAL,
+        query TEXT,
+        rag_response TEXT,
+        -- The relative tolerance its sources agreed within, when an adaptive run stopped on agreement
+        agreement_tolerance REAL,
+        extracted_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS values_brand ON parameter_values (brand, parameter, extracted_at);
+    CREATE INDEX IF NOT EXISTS values_parameter ON parameter_values (parameter, extracted_at);
+
+    CREATE TABLE IF NOT EXISTS sources (
+        value_id INTEGER NOT NULL REFERENCES parameter_values (id) ON DELETE CASCADE,
+        rank INTEGER,
+        url TEXT NOT NULL,
+        title TEXT,
+        summary TEXT,
+        duplicate_of TEXT,
+        also_published_at TEXT,
+        cited INTEGER NOT NULL DEFAULT 0,
+        provisional REAL
+    );
+    CREATE INDEX IF NOT EXISTS sources_value ON sources (value_id);
+""", pragmas=["foreign_keys = ON"])
+
+
+def _simple_options(options):
+    # Only settings that describe the run; shared indexes and traces are left out
+    return {key: value for key, value in options.items() if isinstance(value, (str, int, float, bool, type(None)))}
+
+def record_run(brand, reports, trace, started_at, finished_at=None, models=None, options=None, report=None):
+    """Store one score_brand run and return its id.
+
+    reports maps a pillar name to its execute_* report (or None), trace
+    is the dict pipeline.run_pillar filled in for every parameter, and
+    report is the merged score_brand result, kept as is for latest_run.
+    """
+    finished_at = finished_at or time.time()
+    models = models or {}
+    trace = trace or {}
+    with _db.lock:
+        conn = _db.connect()
+        run_id = conn.execute(
+            "INSERT INTO runs "
+            "(brand, started_at, finished_at, summary_model, extraction_model, options, pillars, report) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (brand, started_at, finished_at, models.get("summary"), models.get("extraction"),
+             json.dumps(_simple_options(options or {})), json.dumps(sorted(reports)),
+             json.dumps(report) if report is not None else None),
+        ).lastrowid
+
+        for pillar, report in reports.items():
+            for key, value in (report or {}).items():
+                if key == "Company":
+                    continue
+                if not isinstance(value, dict):
+                    conn.execute(
+                        "INSERT INTO scores (run_id, pillar, name, score) VALUES (?, ?, ?, ?)",
+                        (run_id, pillar, key, to_number(value)),
+                    )
+                    continue
+                for parameter, extracted in value.items():
+                    _insert_value(conn, run_id, brand, pillar, parameter, extracted, trace.get(parameter) or {}, finished_at)
+        conn.commit()
+    return run_id
+
+def _insert_value(conn, run_id, brand, pillar, parameter, value, provenance, extracted_at):
+    value_id = conn.execute(
+        "INSERT INTO parameter_values "
+        "(run_id, brand, pillar, parameter, value, numeric, query, rag_response, agreement_tolerance, extracted_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (run_id, brand, pillar, parameter, json.dumps(value), to_number(value),
+         provenance.get("query"), provenance.get("rag_response"),
+         (provenance.get("stopping") or {}).get("tolerance"), extracted_at),
+    ).lastrowid
+    citations = set(provenance.get("citations") or [])
+    conn.executemany(
+        "INSERT INTO sources (value_id, rank, url, title, summary, duplicate_of, also_published_at, cited, provisional) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (value_id, result.get("order"), result.get("link"), result.get("title"), result.get("Summary"),
+             result.get("Duplicate of"), json.dumps(result.get("Also published at") or []),
+             int(result.get("link") in citations), to_number(result.get("Provisional value")))
+            for result in provenance.get("results") or [] if result.get("link")
+        ],
+    )
+
+def _iso(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat()
+
+def _value_rows(where, params, limit=None):
+    sql = (
+        "SELECT v.id, v.run_id, v.brand, v.pillar, v.parameter, v.value, v.numeric, v.query, "
+        "v.rag_response, v.extracted_at, r.summary_model, r.extraction_model "
+        f"FROM parameter_values v JOIN runs r ON r.id = v.run_id WHERE {where} "
+        "ORDER BY v.extracted_at DESC, v.id DESC"
+    )
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    conn = _db.connect()
+    rows = conn.execute(sql, params).fetchall()
+    values = []
+    for (value_id, run_id, brand, pillar, parameter, value, numeric, query, rag_response, extracted_at,
+         summary_model, extraction_model) in rows:
+        sources = conn.execute(
+            "SELECT rank, url, title, summary, duplicate_of, also_published_at, cited, provisional "
+            "FROM sources WHERE value_id = ? ORDER BY rank", (value_id,)
+        ).fetchall()
+        values.append({
+            "run_id": run_id,
+            "brand": brand,
+            "pillar": pillar,
+            "parameter": parameter,
+            "value": json.loads(value),
+            "numeric": numeric,
+            "query": query,
+            "rag_response": rag_response,
+            "extracted_at": _iso(extracted_at),
+            "summary_model": summary_model,
+            "extraction_model": extraction_model,
+            "sources": [
+                {
+                    "rank": rank, "url": url, "title": title, "summary": summary, "duplicate_of": duplicate_of,
+                    "also_published_at": json.loads(also or "[]"), "cited": bool(cited),
+                    "provisional": provisional,
+                }
+                for rank, url, title, summary, duplicate_of, also, cited, provisional in sources
+            ],
+        })
+    return values
+
+def latest(brand, parameter):
+    """The most recent value of parameter for brand with its provenance, or None."""
+    with _db.lock:
+        rows = _value_rows("v.brand = ? AND v.parameter = ?", (brand, parameter), limit=1)
+    return rows[0] if rows else None
+
+def history(brand, parameter, limit=None):
+    """Every stored value of parameter for brand, newest first."""
+    with _db.lock:
+        return _value_rows("v.brand = ? AND v.parameter = ?", (brand, parameter), limit)
+
+def across_brands(parameter):
+    """The latest value of parameter for every brand that has one."""
+    with _db.lock:
+        return _value_rows(
+            "v.parameter = ? AND v.id IN (SELECT MAX(id) FROM parameter_values WHERE parameter = ? GROUP BY brand)",
+            (parameter, parameter),
+        )
+
+def source_values(brand, parameter):
+    """(values, tolerance) for the latest value of parameter that has per-source values.
+
+    values are each source's provisional value; only adaptive runs extract
+    those. tolerance is the relative agreement tolerance the run stopped
+    on, or None when it read every result.
+    """
+    with _db.lock:
+        conn = _db.connect()
+        row = conn.execute(
+            "SELECT v.id, v.agreement_tolerance FROM parameter_values v WHERE v.brand = ? AND v.parameter = ? "
+            "AND EXISTS (SELECT 1 FROM sources s WHERE s.value_id = v.id AND s.provisional IS NOT NULL) "
+            "ORDER BY v.extracted_at DESC, v.id DESC LIMIT 1",
+            (brand, parameter),
+        ).fetchone()
+        if row is None:
+            return [], None
+        rows = conn.execute(
+            "SELECT provisional FROM sources WHERE value_id = ? AND provisional IS NOT NULL ORDER BY rank", (row[0],)
+        ).fetchall()
+    return [value for (value,) in rows], row[1]
+
+def latest_run(brand, pillars, max_age=None):
+    """The newest run of brand covering every pillar in pillars, at most max_age seconds old.
+
+    Returns {"run_id", "finished_at", "pillars", "report"} or None.
+    """
+    sql = "SELECT id, finished_at, pillars, report FROM runs WHERE brand = ? AND report IS NOT NULL"
+    params = [brand]
+    if max_age is not None:
+        sql += " AND finished_at >= ?"
+        params.append(time.time() - max_age)
+    with _db.lock:
+        rows = _db.connect().execute(sql + " ORDER BY finished_at DESC, id DESC", params).fetchall()
+    for run_id, finished_at, stored_pillars, report in rows:
+        if set(pillars) <= set(json.loads(stored_pillars or "[]")):
+            return {
+                "run_id": run_id,
+                "finished_at": _iso(finished_at),
+                "pillars": json.loads(stored_pillars),
+                "report": json.loads(report),
+            }
+    return None
+
+def latest_scores(brand):
+    """{score name: score} from the brand's most recent run of each pillar."""
+    with _db.lock:
+        rows = _db.connect().execute(
+            "SELECT s.name, s.score FROM scores s JOIN runs r ON r.id = s.run_id "
+            "WHERE r.brand = ? ORDER BY r.finished_at, r.id", (brand,)
+        ).fetchall()
+    return dict(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description='Query stored byob results')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    for name in ("latest", "history"):
+        command = subcommands.add_parser(name)
+        command.add_argument('brand')
+        command.add_argument('parameter')
+    subcommands.add_parser("brands").add_argument('parameter')
+    subcommands.add_parser("scores").add_argument('brand')
+    args = parser.parse_args()
+
+    if args.command == "latest":
+        result = latest(args.brand, args.parameter)
+    elif args.command == "history":
+        result = history(args.brand, args.parameter)
+    elif args.command == "brands":
+        result = across_brands(args.parameter)
+    else:
+        result = latest_scores(args.brand)
+    print(json.dumps(result, indent=4))
+
+if __name__ == "__main__":
+    main()
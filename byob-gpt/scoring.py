@@ -0,0 +1,246 @@
+import argparse
+import itertools
+import json
+
+import numpy as np
+
+import parsing
+
+# Vectorized versions of calculate_BEI (financial.py), calculate_FSS
+# (customer.py) and calculate_PI (pricing.py). Inputs are either percentages,
+# divided by 100, or min-max normalized and clipped to [0, 1] between bounds.
+PILLAR_SPECS = {
+    "BEI": {
+        "data_key": "Financial Data",
+        "inputs": ["Market Share", "Investor Confidence", "Sales Data"],
+        "weights": [0.4, 0.3, 0.3],
+        "bounds": {"Sales Data": (100000, 10000000)},
+    },
+    "FSS": {
+        "data_key": "Sentiment Data",
+        "inputs": [
+            "Customer Satisfaction Index (CSAT)", "Net Promoter Score (NPS)",
+            "Social Sentiment Analysis", "Purchase & Post-Purchase Experience",
+        ],
+        "weights": [0.3, 0.3, 0.2, 0.2],
+        "bounds": {},
+    },
+    "PI": {
+        "data_key": "Pricing Data",
+        "inputs": ["Pricing Competitiveness", "Innovation Score"],
+        "weights": [0.6, 0.4],
+        "bounds": {},
+    },
+}
+
+
+def to_number(value):
+    # NaN where parsing finds no number, so missing values stay in the arrays
+    number = parsing.to_number(value)
+    return np.nan if number is None else number
+
+def parameter_table(results):
+    """Build (brands, {parameter: array}) from byob reports.
+
+    results is a list of score_brand reports, or the dict written by
+    byob.py --brands. Missing values are NaN.
+    """
+    if isinstance(results, dict):
+        results = results["results"]
+    brands = [result["Company"] for result in results]
+    table = {}
+    for spec in PILLAR_SPECS.values():
+        for parameter in spec["inputs"]:
+            table[parameter] = np.array(
+                [to_number((result.get(spec["data_key"]) or {}).get(parameter)) for result in results]
+            )
+    return brands, table
+
+def normalized_inputs(table, pillar, bounds=None):
+    """Return the pillar's inputs as an array of shape (n_bounds, n_brands, n_inputs).
+
+    bounds maps an input to (min, max), each a scalar or a 1-D array; all
+    arrays given must share one length, the n_bounds axis.
+    """
+    spec = PILLAR_SPECS[pillar]
+    bounds = {**spec["bounds"], **(bounds or {})}
+    n_bounds = max([np.size(low) for low, _ in bounds.values()] + [np.size(high) for _, high in bounds.values()] + [1])
+
+    columns = []
+    for parameter in spec["inputs"]:
+        # Missing inputs count as 0, as in the scalar calculate_* functions
+        values = np.nan_to_num(table[parameter], nan=0.0)
+        if parameter in bounds:
+            low, high = (np.reshape(np.asarray(bound, dtype=float), (-1, 1)) for bound in bounds[parameter])
+            column = np.clip((values[None, :] - low) / (high - low), 0.0, 1.0)
+            column = np.broadcast_to(column, (n_bounds, values.size))
+        else:
+            column = np.broadcast_to(values / 100.0, (n_bounds, values.size))
+        columns.append(column)
+    return np.stack(columns, axis=-1)
+
+def pillar_scores(table, weights=None, bounds=None):
+    """Score every brand on every pillar with one weighting; returns {pillar: array}."""
+    scores = {}
+    for pillar, spec in PILLAR_SPECS.items():
+        w = np.asarray((weights or {}).get(pillar, spec["weights"]), dtype=float)
+        scores[pillar] = np.round(normalized_inputs(table, pillar, (bounds or {}).get(pillar))[0] @ w, 2)
+    return scores
+
+def weight_grid(n_inputs, step=0.05):
+    """Every weighting of n_inputs on a step grid whose weights sum to 1."""
+    units = int(round(1 / step))
+    rows = [
+        np.diff([0, *cuts, units]) / units
+        for cuts in itertools.combinations_with_replacement(range(units + 1), n_inputs - 1)
+    ]
+    return np.array(rows)
+
+def sweep(table, pillar, weights, bounds=None):
+    """Scores under many weightings and bounds at once.
+
+    weights has shape (n_weightings, n_inputs). The result has shape
+    (n_weightings, n_bounds, n_brands).
+    """
+    inputs = normalized_inputs(table, pillar, bounds)
+    return np.einsum("mbk,wk->wmb", inputs, np.asarray(weights, dtype=float))
+
+def ranks(scores):
+    """Rank brands along the last axis, 1 for the highest score."""
+    order = np.argsort(-scores, axis=-1, kind="stable")
+    ranked = np.empty_like(order)
+    np.put_along_axis(ranked, order, np.arange(1, scores.shape[-1] + 1), axis=-1)
+    return ranked
+
+def sweep_summary(brands, scores):
+    rank = ranks(scores).reshape(-1, len(brands))
+    return {
+        brand: {
+            "mean_rank": round(float(rank[:, i].mean()), 2),
+            "best_rank": int(rank[:, i].min()),
+            "worst_rank": int(rank[:, i].max()),
+            "share_ranked_first": round(float((rank[:, i] == 1).mean()), 3),
+        }
+        for i, brand in enumerate(brands)
+    }
+
+# Standard deviation of an input as a share of its value, when no spread is given
+DEFAULT_RELATIVE_SPREAD = 0.15
+
+def monte_carlo(table, spreads=None, samples=10000, percentiles=(5, 50, 95), bounds=None, seed=None):
+    """Percentile intervals of every pillar score under noisy inputs.
+
+    Each input is drawn from a normal around its extracted value. spreads
+    maps a parameter to its standard deviation in input units, a scalar or
+    one value per brand (for example from source_spreads); inputs without
+    one, or with NaN, use DEFAULT_RELATIVE_SPREAD of their value. Returns
+    {pillar: array of shape (n_brands, len(percentiles))}.
+    """
+    rng = np.random.default_rng(seed)
+    spreads = spreads or {}
+    n_brands = len(next(iter(table.values())))
+    # Pillars are reported separately, so they can share one block of noise
+    # per input slot; inputs within a pillar stay independent
+    noise = rng.standard_normal(
+        (max(len(spec["inputs"]) for spec in PILLAR_SPECS.values()), n_brands, samples), dtype=np.float32
+    )
+    intervals = {}
+    for pillar, spec in PILLAR_SPECS.items():
+        pillar_bounds = {**spec["bounds"], **((bounds or {}).get(pillar) or {})}
+        total = None
+        for slot, (parameter, weight) in enumerate(zip(spec["inputs"], spec["weights"])):
+            center = np.nan_to_num(table[parameter], nan=0.0).astype(np.float32)
+            spread = np.abs(center) * DEFAULT_RELATIVE_SPREAD
+            if parameter in spreads:
+                given = np.broadcast_to(np.asarray(spreads[parameter], dtype=np.float32), center.shape)
+                spread = np.where(np.isnan(given), spread, given)
+            draws = noise[slot] * spread[:, None]
+            draws += center[:, None]
+            if parameter in pillar_bounds:
+                low, high = pillar_bounds[parameter]
+                np.clip((draws - low) / (high - low), 0.0, 1.0, out=draws)
+            else:
+                draws /= 100.0
+            draws *= weight
+            total = draws if total is None else total + draws
+        intervals[pillar] = np.percentile(total, percentiles, axis=1).T
+    return intervals
+
+# Fewer sources than this say nothing about how far apart they are
+MIN_SOURCES = 2
+
+def source_spreads(brands, values_for=None):
+    """{parameter: per-brand standard deviation between sources' values}.
+
+    values_for(brand, parameter) returns the values individual sources
+    gave and the relative tolerance they were stopped within (or None), by
+    default results_store.source_values. A run that stopped as soon as its
+    sources agreed kept only agreeing values, so its spread is widened to
+    at least that tolerance of their mean. Brands with fewer than
+    MIN_SOURCES values get NaN, so monte_carlo falls back to
+    DEFAULT_RELATIVE_SPREAD for them. Parameters with no spread for any
+    brand are left out.
+    """
+    if values_for is None:
+        import results_store
+        values_for = results_store.source_values
+    spreads = {}
+    for spec in PILLAR_SPECS.values():
+        for parameter in spec["inputs"]:
+            column = []
+            for brand in brands:
+                values, tolerance = values_for(brand, parameter)
+                values = [value for value in map(to_number, values) if not np.isnan(value)]
+                if len(values) < MIN_SOURCES:
+                    column.append(np.nan)
+                    continue
+                column.append(max(np.std(values, ddof=1), (tolerance or 0) * abs(np.mean(values))))
+            if not np.all(np.isnan(column)):
+                spreads[parameter] = np.array(column)
+    return spreads
+
+def main():
+    parser = argparse.ArgumentParser(description='Score byob results and sweep pillar weightings')
+    parser.add_argument('results', type=str, help='Consolidated results written by byob.py --brands')
+    parser.add_argument('--sweep', choices=list(PILLAR_SPECS), help='Pillar whose weightings to sweep')
+    parser.add_argument('--step', type=float, default=0.05, help='Weight grid step for --sweep')
+    parser.add_argument('--min_sales', type=float, nargs='+', help='Alternative lower sales bounds for a BEI sweep')
+    parser.add_argument('--max_sales', type=float, nargs='+', help='Alternative upper sales bounds for a BEI sweep')
+    parser.add_argument('--intervals', action='store_true', help='Monte Carlo 5/50/95th percentile intervals')
+    parser.add_argument('--samples', type=int, default=10000, help='Samples per input for --intervals')
+    parser.add_argument('--heuristic_spreads', action='store_true',
+                        help='Ignore stored per-source values and draw every input with a flat relative spread')
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        brands, table = parameter_table(json.load(f))
+
+    scores = pillar_scores(table)
+    for i, brand in enumerate(brands):
+        print(f"{brand}: " + ", ".join(f"{pillar} {scores[pillar][i]}" for pillar in PILLAR_SPECS))
+
+    if args.intervals:
+        spreads = {} if args.heuristic_spreads else source_spreads(brands)
+        measured = sum(int(np.count_nonzero(~np.isnan(column))) for column in spreads.values())
+        print(f"\nSpread between sources for {measured} brand inputs; "
+              f"the rest use {DEFAULT_RELATIVE_SPREAD:.0%} of their value")
+        intervals = monte_carlo(table, spreads, samples=args.samples)
+        print(f"5th / 50th / 95th percentiles over {args.samples} samples:")
+        for i, brand in enumerate(brands):
+            print(f"{brand}: " + ", ".join(
+                f"{pillar} {' / '.join(f'{value:.2f}' for value in intervals[pillar][i])}" for pillar in PILLAR_SPECS
+            ))
+
+    if args.sweep:
+        spec = PILLAR_SPECS[args.sweep]
+        bounds = None
+        if args.sweep == "BEI" and (args.min_sales or args.max_sales):
+            low, high = spec["bounds"]["Sales Data"]
+            bounds = {"Sales Data": (np.array(args.min_sales or [low]), np.array(args.max_sales or [high]))}
+        weights = weight_grid(len(spec["inputs"]), args.step)
+        swept = sweep(table, args.sweep, weights, bounds)
+        print(f"\n{args.sweep} over {swept.shape[0]} weightings x {swept.shape[1]} bounds:")
+        print(json.dumps(sweep_summary(brands, swept), indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import datetime
+import json
+import os
+import re
+import time
+
+import storage
+
+# Search API responses shared by the byob pipelines, the dealership agent and
+# the social media agents. Entries are keyed on provider and normalized query,
+# and every real API call is counted against that provider's daily quota.
+CACHE_PATH = os.path.join(storage.CACHE_DIR, "search.db")
+ENABLED = os.getenv("BYOB_SEARCH_CACHE", "1") != "0"
+
+TTLS = {
+    "google_cse": int(os.getenv("BYOB_CSE_CACHE_TTL", 24 * 3600)),
+    "serpapi": int(os.getenv("BYOB_SERPAPI_CACHE_TTL", 7 * 24 * 3600)),
+}
+DEFAULT_TTL = 24 * 3600
+
+DAILY_QUOTAS = {
+    "google_cse": int(os.getenv("BYOB_CSE_DAILY_QUOTA", 100)),
+    "serpapi": int(os.getenv("BYOB_SERPAPI_DAILY_QUOTA", 100)),
+}
+
+_counters = {"hits": 0, "misses": 0}
+_db = storage.Database(CACHE_PATH, """
+    CREATE TABLE IF NOT EXISTS searches (
+        provider TEXT NOT NULL,
+        query TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (provider, query)
+    );
+    CREATE TABLE IF NOT EXISTS quota (
+        provider TEXT NOT NULL,
+        day TEXT NOT NULL,
+        calls INTEGER NOT NULL,
+        PRIMARY KEY (provider, day)
+    );
+""")
+
+
+def normalize_query(query, params=None):
+    normalized = re.sub(r"\s+", " ", query).strip().lower()
+    if params:
+        normalized += " " + json.dumps(params, sort_keys=True, default=str)
+    return normalized
+
+def _today():
+    return datetime.date.today().isoformat()
+
+def _count_call(conn, provider):
+    conn.execute(
+        "INSERT INTO quota (provider, day, calls) VALUES (?, ?, 1) "
+        "ON CONFLICT (provider, day) DO UPDATE SET calls = calls + 1",
+        (provider, _today()),
+    )
+    calls = conn.execute(
+        "SELECT calls FROM quota WHERE provider = ? AND day = ?", (provider, _today())
+    ).fetchone()[0]
+    quota = DAILY_QUOTAS.get(provider)
+    if quota and calls > quota:
+        print(f"Warning: {provider} has made {calls} calls today, over its quota of {quota}")
+
+def cached_search(provider, query, fetch, params=None):
+    """Return the cached response for query, calling fetch() on a miss."""
+    key = normalize_query(query, params)
+    ttl = TTLS.get(provider, DEFAULT_TTL)
+
+    if ENABLED:
+        with _db.lock:
+            row = _db.connect().execute(
+                "SELECT response, created_at FROM searches WHERE provider = ? AND query = ?", (provider, key)
+            ).fetchone()
+            if row and time.time() - row[1] < ttl:
+                _counters["hits"] += 1
+                return json.loads(row[0])
+            _counters["misses"] += 1
+
+    response = fetch()
+
+    with _db.lock:
+        conn = _db.connect()
+        _count_call(conn, provider)
+        # Error payloads are not cached so the next run retries the query
+        if ENABLED and isinstance(response, dict) and "error" not in response:
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (provider, query, response, created_at) VALUES (?, ?, ?, ?)",
+                (provider, key, json.dumps(response), time.time()),
+            )
+        conn.commit()
+    return response
+
+def quota_used(provider, day=None):
+    with _db.lock:
+        row = _db.connect().execute(
+            "SELECT calls FROM quota WHERE provider = ? AND day = ?", (provider, day or _today())
+        ).fetchone()
+    return row[0] if row else 0
+
+def stats():
+    with _db.lock:
+        return dict(_counters)
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import byob
+import pipeline
+import results_store
+
+# Long-running HTTP front for byob.score_brand:
+#
+#   GET /score/{brand}?pillars=access,pricing&max_age=3600&refresh=1
+#   GET /health
+#
+# A brand scored within the freshness window (FRESHNESS seconds, or max_age)
+# is answered from the results store. Otherwise the request starts a run, and
+# every identical request arriving while it is in flight waits on that same
+# run instead of starting its own. At most MAX_RUNS runs go at once; the
+# pipelines themselves run on threads, so the event loop keeps answering.
+FRESHNESS = int(os.getenv("BYOB_SERVICE_FRESHNESS", 24 * 3600))
+MAX_RUNS = int(os.getenv("BYOB_SERVICE_RUNS", 2))
+MAX_HEADER_BYTES = 16 * 1024
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ScoringService:
+    def __init__(self, options=None, freshness=FRESHNESS, max_runs=MAX_RUNS):
+        """options are passed to score_brand for every run."""
+        self.options = options or {}
+        self.freshness = freshness
+        self.runs = asyncio.Semaphore(max_runs)
+        self.in_flight = {}
+        self.counters = {"store": 0, "run": 0, "coalesced": 0, "failed": 0}
+
+    async def score(self, brand, pillars, max_age, refresh):
+        # No pillars means all of them, so a one-pillar run cannot answer it
+        wanted = pillars or list(byob.PILLARS)
+        if not refresh:
+            stored = await asyncio.to_thread(results_store.latest_run, brand, wanted, max_age)
+            if stored:
+                self.counters["store"] += 1
+                return self._response(brand, "store", stored)
+
+        key = (brand.casefold(), tuple(sorted(wanted)))
+        run = self.in_flight.get(key)
+        source = "coalesced"
+        if run is None:
+            source = "run"
+            run = asyncio.create_task(self._run(brand, pillars))
+            self.in_flight[key] = run
+            run.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # A client hanging up must not cancel a run others are waiting on
+        stored = await asyncio.shield(run)
+        self.counters[source] += 1
+        return self._response(brand, source, stored)
+
+    async def _run(self, brand, pillars):
+        async with self.runs:
+            print(f"Scoring {brand} on {', '.join(pillars or byob.PILLARS)}")
+            try:
+                # Each run gets its own options; score_brand adds a trace and any dedup index to them
+                result = await asyncio.to_thread(byob.score_brand, brand, pillars, True, **dict(self.options))
+            except Exception:
+                self.counters["failed"] += 1
+                raise
+        if result.get("Error"):
+            # The pillars that did finish are stored, but a partial report is not an answer
+            self.counters["failed"] += 1
+            raise RuntimeError(f"Scoring {brand} failed on {result['Error']}")
+        stored = await asyncio.to_thread(results_store.latest_run, brand, pillars or list(byob.PILLARS))
+        if stored is None:
+            raise RuntimeError(f"The run for {brand} was not stored")
+        return stored
+
+    def _response(self, brand, source, stored):
+        return {
+            "brand": brand,
+            "source": source,
+            "run_id": stored["run_id"],
+            "finished_at": stored["finished_at"],
+            "pillars": stored["pillars"],
+            "report": stored["report"],
+        }
+
+    def health(self):
+        return {
+            "status": "ok",
+            "in_flight": [{"brand": brand, "pillars": list(pillars)} for brand, pillars in self.in_flight],
+            "requests": dict(self.counters),
+        }
+
+    async def route(self, method, target):
+        url = urlsplit(target)
+        if method != "GET":
+            raise HTTPError(405, f"{method} is not supported")
+        if url.path == "/health":
+            return self.health()
+        if not url.path.startswith("/score/"):
+            raise HTTPError(404, f"No route for {url.path}")
+
+        brand = unquote(url.path[len("/score/"):]).strip()
+        if not brand:
+            raise HTTPError(400, "A brand is required: /score/{brand}")
+        params = parse_qs(url.query)
+        pillars = [
+            pillar.strip() for value in params.get("pillars", []) for pillar in value.split(",") if pillar.strip()
+        ]
+        unknown = [pillar for pillar in pillars if pillar not in byob.PILLARS]
+        if unknown:
+            raise HTTPError(400, f"Unknown pillars {unknown}; choose from {list(byob.PILLARS)}")
+        try:
+            max_age = float(params.get("max_age", [self.freshness])[0])
+        except ValueError:
+            raise HTTPError(400, "max_age must be a number of seconds")
+        refresh = params.get("refresh", ["0"])[0].lower() in ("1", "true", "yes")
+        return await self.score(brand, sorted(set(pillars)) or None, max_age, refresh)
+
+    async def handle(self, reader, writer):
+        started = time.perf_counter()
+        status, body, request_line = 200, None, ""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+            parts = request_line.split()
+            if len(parts) != 3:
+                raise HTTPError(400, "Malformed request line")
+            body = await self.route(parts[0], parts[1])
+        except HTTPError as e:
+            status, body = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            print(f"Error handling {request_line}: {e}")
+            status, body = 500, {"error": str(e)}
+
+        data = json.dumps(body, indent=4).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_STATUS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode() + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        print(f"{request_line} -> {status} in {time.perf_counter() - started:.2f}s")
+
+
+async def serve(host, port, options, freshness=FRESHNESS, max_runs=MAX_RUNS):
+    service = ScoringService(options, freshness, max_runs)
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving byob scores on http://{host}:{port}/score/{{brand}}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve byob brand scores over HTTP')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--freshness', type=int, default=FRESHNESS,
+                        help='Seconds a stored run is served before a request rescores the brand')
+    parser.add_argument('--max_runs', type=int, default=MAX_RUNS, help='Brands scored at the same time')
+    parser.add_argument('--summary_mode', choices=["sequential", "map_reduce"], default="sequential")
+    parser.add_argument('--chunk_top_k', type=int, default=pipeline.DEFAULT_OPTIONS["chunk_top_k"])
+    parser.add_argument('--executor', choices=["threads", "dag"], default="threads")
+    parser.add_argument('--plan_queries', action='store_true')
+    parser.add_argument('--fused', action='store_true')
+    args = parser.parse_args()
+
+    options = {
+        "summary_mode": args.summary_mode,
+        "chunk_top_k": args.chunk_top_k,
+        "executor": args.executor,
+        "plan_queries": args.plan_queries,
+        "fused": args.fused,
+    }
+    try:
+        asyncio.run(serve(args.host, args.port, options, args.freshness, args.max_runs))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Local stand-ins for the OpenAI chat API, Google Custom Search and the pages
+# it links to, all on one port, so byob.py and service.py can run end to end
+# without keys or network. Answers are deterministic: an extracted value
+# depends only on its parameter name. LATENCY seconds are added to every
+# chat completion to make runs take roughly as long as they would live.
+LATENCY = 0.0
+RESULTS_PER_QUERY = 3
+
+_TERM = re.compile(r"\*\*'([^']+)'\*\*")
+_counters = {"chat": 0, "search": 0, "page": 0}
+_lock = threading.Lock()
+
+
+def value_for(term):
+    return 10 + zlib.crc32(term.encode()) % 80
+
+def _example(schema, index=0):
+    # The smallest value that satisfies a strict json_schema
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next(k for k in kind if k != "null")
+    if kind == "object":
+        return {name: _example(prop, index) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_example(schema["items"], i) for i in range(schema.get("minItems", 0))]
+    if kind == "integer":
+        return index
+    if kind == "number":
+        return 42
+    return "Stand-in reply"
+
+def _chat_reply(request):
+    text = "\n".join(message.get("content") or "" for message in request.get("messages", []))
+    terms = _TERM.findall(text)
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        if set(schema.get("required", [])) == {"value"}:
+            match = re.search(r"value of '([^']+)'", text)
+            return json.dumps({"value": value_for(match.group(1)) if match else None})
+        reply = _example(schema)
+        for name, prop in schema.get("properties", {}).items():
+            if prop.get("required") == ["value", "citations"]:
+                reply[name] = {"value": value_for(name), "citations": []}
+        return json.dumps(reply)
+    if terms and "```json" in text:
+        return f'```json\n{{"{terms[0]}": {value_for(terms[0])}}}\n```'
+    subject = terms[0] if terms else "the query"
+    return f"The sources report {value_for(subject)} for {subject} in India [stand-in source]."
+
+def _completion(request):
+    content = _chat_reply(request)
+    return {
+        "id": f"chatcmpl-standin-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "standin"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"},
+        ],
+        "usage": {
+            "prompt_tokens": len(json.dumps(request.get("messages", []))) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(json.dumps(request.get("messages", []))) + len(content)) // 4,
+        },
+    }
+
+def _search(base_url, query, num):
+    slug = quote(re.sub(r"\W+", "-", query.lower()).strip("-")[:60])
+    return {
+        "kind": "customsearch#search",
+        "items": [
+            {
+                "title": f"{query} - result {i}",
+                "link": f"{base_url}/page/{slug}-{i}",
+                "snippet": f"Stand-in result {i} for {query}",
+            }
+            for i in range(1, min(num, RESULTS_PER_QUERY) + 1)
+        ],
+    }
+
+def _page(slug):
+    topic = slug.replace("-", " ")
+    paragraph = f"<p>Reporting on {topic}. The figure for India was {value_for(topic)} this year.</p>"
+    return f"<html><head><title>{topic}</title></head><body><article>{paragraph * 40}</article></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type="application/json"):
+        data = (json.dumps(body) if content_type == "application/json" else body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self, name):
+        with _lock:
+            _counters[name] += 1
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/customsearch/v1":
+            self._count("search")
+            params = parse_qs(url.query)
+            base_url = f"http://{self.headers.get('Host')}"
+            self._send(200, _search(base_url, params.get("q", [""])[0], int(params.get("num", ["10"])[0])))
+        elif url.path.startswith("/page/"):
+            self._count("page")
+            self._send(200, _page(url.path[len("/page/"):]), "text/html; charset=utf-8")
+        elif url.path == "/stats":
+            with _lock:
+                self._send(200, dict(_counters))
+        else:
+            self._send(404, {"error": {"message": f"No stand-in for {url.path}"}})
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, {"error": {"message": f"No stand-in for {self.path}"}})
+            return
+        self._count("chat")
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if LATENCY:
+            time.sleep(LATENCY)
+        self._send(200, _completion(request))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description='Local stand-ins for the OpenAI and Custom Search APIs')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every chat completion')
+    args = parser.parse_args()
+    LATENCY = args.latency
+
+    server = serve(args.host, args.port)
+    base_url = f"http://{args.host}:{args.port}"
+    print("Point byob at the stand-ins with:")
+    print(f"  export OPENAI_BASE_URL={base_url}/v1 OPENAI_API_KEY=standin")
+    print(f"  export BYOB_CSE_ENDPOINT={base_url} CUSTOM_SEARCH_API_KEY=standin SEARCH_ENGINE_ID=standin")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import threading
+
+# Where byob keeps its state on disk. The caches and domain health keep their
+# SQLite files under CACHE_DIR; the results store and job queue default to
+# files next to the repo. Each file is a Database: opened on first use, its
+# tables created then, and one connection shared by every thread under lock.
+CACHE_DIR = os.getenv("BYOB_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".byob_cache"))
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+class Database:
+    def __init__(self, path, schema, pragmas=(), autocommit=False):
+        """schema is the SQL script that creates the file's tables; pragmas run before it."""
+        self.path = path
+        self.schema = schema
+        self.pragmas = pragmas
+        self.autocommit = autocommit
+        self.lock = threading.Lock()
+        self._conn = None
+
+    def connect(self):
+        """The shared connection, opened the first time; callers hold lock."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            options = {"isolation_level": None} if self.autocommit else {}
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, **options)
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+            conn.executescript(self.schema)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
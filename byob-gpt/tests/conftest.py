@@ -0,0 +1,45 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+# Tests exercise the pipeline itself, so every on-disk cache goes to a
+# throwaway directory and is switched off before pipeline.py reads them
+benchmark.throwaway_caches()
+
+import clients  # noqa: E402
+import results_store  # noqa: E402
+import standins  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standin_server():
+    """standins.py on a free port, with the OpenAI and CSE clients pointed at it."""
+    server = standins.serve(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("OPENAI_BASE_URL", f"{base_url}/v1")
+        patch.setenv("OPENAI_API_KEY", "standin")
+        patch.setenv("BYOB_CSE_ENDPOINT", base_url)
+        patch.setenv("CUSTOM_SEARCH_API_KEY", "standin")
+        patch.setenv("SEARCH_ENGINE_ID", "standin")
+        clients.reset()
+        yield base_url
+    clients.reset()
+    server.shutdown()
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """results_store writing to a fresh database."""
+    monkeypatch.setattr(results_store._db, "path", str(tmp_path / "results.db"))
+    monkeypatch.setattr(results_store._db, "_conn", None)
+    yield results_store
+    results_store._db.close()
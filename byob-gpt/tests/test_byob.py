@@ -0,0 +1,24 @@
+import byob
+import customer
+import financial
+import pricing
+
+
+def test_failing_pillar_keeps_the_others(store, monkeypatch):
+    def access(company_name, **options):
+        return {"Company": company_name, "Access Data": {"Dealer Network": 120}, "AI Score": 0.6}
+    def sentiment(company_name, **options):
+        raise TypeError("unsupported operand type(s) for /: 'str' and 'int'")
+    monkeypatch.setattr(byob, "PILLARS", {"access": access, "sentiment": sentiment})
+
+    result = byob.score_brand("Audi", store=True)
+    assert result["AI Score"] == 0.6
+    assert list(result["Error"]) == ["sentiment"]
+    assert store.latest_scores("Audi") == {"AI Score": 0.6}
+    assert store.latest_run("Audi", ["access"])["pillars"] == ["access"]
+    assert store.latest_run("Audi", ["access", "sentiment"]) is None
+
+def test_scores_read_extracted_strings():
+    assert customer.calculate_FSS("85%", "40", None, 70) == 0.52
+    assert financial.calculate_BEI("12.5%", "60", "5,050,000 units") == 0.38
+    assert pricing.calculate_PI("4.2/5", "n/a") == 0.03
@@ -0,0 +1,17 @@
+import pytest
+
+import chunking
+
+
+@pytest.mark.parametrize("budget, overlap", [(500, 50), (6000, 200), (300, 0)])
+def test_chunks_fit_their_budget(budget, overlap):
+    text = " ".join(f"Sentence number {i} is here." for i in range(3000))
+    chunks = list(chunking.chunk_content(text, budget, overlap))
+    assert len(chunks) > 1
+    assert max(chunking.count_tokens(chunk) for chunk in chunks) <= budget
+
+def test_long_sentences_are_cut_within_budget():
+    text = " ".join("seventy" for _ in range(5000)) + "."
+    chunks = list(chunking.chunk_content(text, 500, 50))
+    assert max(chunking.count_tokens(chunk) for chunk in chunks) <= 500
+    assert " ".join(chunks).count("seventy") >= 5000
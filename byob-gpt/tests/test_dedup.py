@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+import dag
+import dedup
+import pipeline
+
+ARTICLE = " ".join(f"Audi sold {i} cars in India this month, dealers said." for i in range(40))
+
+
+def test_claims_fold_own_copies_and_share_others():
+    index = dedup.DuplicateIndex()
+    first, second = dedup.Claims(index), dedup.Claims(index)
+    fingerprint = dedup.simhash(ARTICLE)
+
+    original = {'link': "https://a.example/1", 'title': ""}
+    entry, role = first.claim(fingerprint, original)
+    assert role == "new"
+    assert first.claim(fingerprint, {'link': "https://b.example/1", 'title': ""})[1] == "own copy"
+    assert original['Also published at'] == ["https://b.example/1"]
+
+    copy = {'link': "https://c.example/1", 'title': "snippet"}
+    assert second.claim(fingerprint, copy)[1] == "shared"
+    first.summarized(entry, "summary")
+    second.collect_shared()
+    assert copy == {'link': "https://c.example/1", 'title': "snippet", 'Duplicate of': original['link'],
+                    'Summary': "summary"}
+
+def test_released_pages_fall_back_to_the_snippet():
+    index = dedup.DuplicateIndex()
+    owner, other = dedup.Claims(index), dedup.Claims(index)
+    fingerprint = dedup.simhash(ARTICLE)
+    owner.claim(fingerprint, {'link': "https://a.example/1", 'title': ""})
+    copy = {'link': "https://c.example/1", 'title': "snippet"}
+    other.claim(fingerprint, copy)
+    owner.release()
+    other.collect_shared()
+    assert copy['Summary'] == "[Fallback summary] snippet"
+
+def test_failed_dag_pillar_releases_pages_other_pillars_wait_on(monkeypatch):
+    def planned_search(company_name, parameter, options):
+        if parameter == "Broken":
+            time.sleep(0.2)
+            raise RuntimeError("search failed")
+        return [{'link': "https://a.example/1", 'snippet': ""}], "query"
+
+    def summarize_page(*args):
+        time.sleep(1)
+        return "summary"
+
+    monkeypatch.setattr(pipeline, "planned_search", planned_search)
+    monkeypatch.setattr(pipeline, "download", lambda url: {"text": ARTICLE})
+    monkeypatch.setattr(pipeline, "summarize_page", summarize_page)
+
+    index = dedup.DuplicateIndex()
+    pillar = {"name": "test", "parameters": ["Slow", "Broken"], "summary_prompt": "", "rag_prompt": "",
+              "extract": None}
+    options = {**pipeline.DEFAULT_OPTIONS, "dedup": "run", "duplicates": index}
+    errors = []
+    run = threading.Thread(target=lambda: _capture(errors, dag.run_pillar, "Audi", pillar, options))
+    run.start()
+    while not index.entries:
+        time.sleep(0.01)
+
+    # A parameter of another pillar finds the page "Slow" owns and waits on it
+    other = dedup.Claims(index)
+    copy = {'link': "https://c.example/1", 'title': "snippet"}
+    assert other.claim(dedup.simhash(ARTICLE), copy)[1] == "shared"
+    run.join(timeout=10)
+    assert [str(error) for error in errors] == ["search failed"]
+    future = other.pending()[0]
+    assert future.done()
+    with pytest.raises(RuntimeError):
+        future.result()
+
+
+def _capture(errors, fn, *args):
+    try:
+        fn(*args)
+    except Exception as e:
+        errors.append(e)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import domain_health
+import pipeline
+
+
+@pytest.fixture
+def health(monkeypatch):
+    # conftest switches domain health off
+    monkeypatch.setattr(domain_health, "ENABLED", True)
+    domain_health.reset()
+    yield domain_health
+    domain_health.reset()
+    domain_health._trials.clear()
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} Error", response=response)
+
+
+@pytest.mark.parametrize("error, counts", [
+    (_http_error(404), False),
+    (_http_error(410), False),
+    (_http_error(403), True),
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (requests.Timeout(), True),
+    (requests.ConnectionError(), True),
+    (ValueError(), False),
+])
+def test_only_domain_failures_count(error, counts):
+    assert domain_health.is_domain_failure(error) is counts
+
+def test_breaker_opens_after_consecutive_failures(health):
+    url = "https://news.example.com/a"
+    for _ in range(health.FAILURE_THRESHOLD - 1):
+        health.record(url, False, 0.1, "HTTP 503")
+    assert health.allow(url) == (True, None)
+    health.record(url, False, 0.1, "HTTP 503")
+    allowed, reason = health.allow("https://www.news.example.com/b")
+    assert not allowed and "HTTP 503" in reason
+    assert health.open_circuits() == ["news.example.com"]
+
+def test_one_trial_fetch_after_the_cooldown(health, monkeypatch):
+    url = "https://news.example.com/a"
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record(url, False, 0.1, "timeout")
+    later = time.time() + health.COOLDOWN + 1
+    monkeypatch.setattr(health.time, "time", lambda: later)
+    assert health.allow(url) == (True, None)
+    assert not health.allow(url)[0]
+    # A failed trial trips the breaker again straight away, for twice as long
+    health.record(url, False, 0.1, "timeout")
+    assert health.health("news.example.com")["trips"] == 2
+
+def test_unparsed_trial_does_not_block_the_domain(health, monkeypatch):
+    url = "https://news.example.com/a"
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record(url, False, 0.1, "timeout")
+    later = time.time() + health.COOLDOWN + 1
+    monkeypatch.setattr(health.time, "time", lambda: later)
+    monkeypatch.setattr(pipeline, "_http_get", lambda url, headers, timeout: _response(url))
+    monkeypatch.setattr(pipeline.page_cache, "lookup", lambda url: None)
+    # The trial's page is downloaded but never parsed, as when its dag pillar fails
+    downloaded = pipeline.download(url)
+    assert downloaded["data"] == b"ok"
+    assert health.allow(url) == (True, None)
+    # A trial outcome recorded after the download ended still counts as one
+    health.record(url, False, 0.1, "bot wall")
+    assert health.health("news.example.com")["trips"] == 2
+
+def test_dead_articles_do_not_open_the_breaker(health, monkeypatch):
+    def get(url, headers=None, timeout=None, stream=None):
+        response = requests.Response()
+        response.status_code = 404
+        response.url = url
+        return response
+
+    monkeypatch.setattr(pipeline, "_http_get", lambda url, headers, timeout: get(url))
+    for i in range(health.FAILURE_THRESHOLD + 2):
+        assert pipeline.download(f"https://news.example.com/gone-{i}") is None
+    assert health.open_circuits() == []
+    assert health.health("news.example.com")["success_rate"] == 1.0
+
+def test_latency_excludes_waiting_for_a_host_slot(health, monkeypatch):
+    monkeypatch.setattr(pipeline, "_http_get", lambda url, headers, timeout: (time.sleep(0.2), _response(url))[1])
+    monkeypatch.setattr(pipeline.page_cache, "lookup", lambda url: None)
+    downloads = []
+    threads = [
+        threading.Thread(target=lambda i=i: downloads.append(pipeline.download(f"https://busy.example.com/{i}")))
+        for i in range(pipeline.MAX_CONNECTIONS_PER_HOST * 3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The last fetches queued for 0.4s behind the others but took 0.2s each
+    assert max(downloaded["seconds"] for downloaded in downloads) < 0.35
+
+
+def _response(url):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers["Content-Type"] = "text/plain"
+    response.raw = __import__("io").BytesIO(b"ok")
+    return response
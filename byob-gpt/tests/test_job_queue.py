@@ -0,0 +1,46 @@
+import pytest
+
+import job_queue
+
+
+@pytest.fixture
+def queue(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_queue._db, "path", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(job_queue._db, "_conn", None)
+    yield job_queue
+    job_queue._db.close()
+
+
+def test_lapsed_lease_is_taken_over(queue):
+    batch, added = queue.enqueue(["Tata"], ["pricing"], batch="b")
+    assert added == 1
+    # A negative lease has lapsed by the time anyone looks
+    job = queue.claim("a", batch, lease=-1)
+    assert job["attempts"] == 1
+    taken = queue.claim("b", batch)
+    assert taken["id"] == job["id"] and taken["attempts"] == 2
+    assert not queue.renew(job["id"], "a")
+    assert not queue.complete(job["id"], "a", {"Pricing Data": {}})
+    assert queue.complete(taken["id"], "b", {"Pricing Data": {}})
+    assert queue.progress(batch)["done"] == 1
+
+def test_live_lease_is_not_handed_out(queue):
+    batch, _ = queue.enqueue(["Tata"], ["pricing"], batch="b")
+    job = queue.claim("a", batch)
+    assert queue.claim("b", batch) is None
+    assert queue.renew(job["id"], "a")
+
+def test_lapsed_lease_out_of_attempts_fails(queue):
+    batch, _ = queue.enqueue(["Tata"], ["pricing"], batch="b", max_attempts=1)
+    queue.claim("a", batch, lease=-1)
+    assert queue.claim("b", batch) is None
+    stats = queue.progress(batch)
+    assert stats["failed"] == 1 and stats["leased"] == 0
+    assert queue.batch_results(batch)["results"][0]["Error"] == {"pricing": "lease expired on attempt 1"}
+
+def test_failed_job_waits_out_its_backoff(queue):
+    batch, _ = queue.enqueue(["Tata"], ["pricing"], batch="b", max_attempts=2)
+    job = queue.claim("a", batch)
+    assert queue.fail(job["id"], "a", "timeout") == "queued"
+    assert queue.claim("a", batch) is None
+    assert queue.retry(batch) == 0
@@ -0,0 +1,55 @@
+import json
+from urllib.request import urlopen
+
+import pytest
+
+import llm_backends
+import standins
+
+
+@pytest.fixture(autouse=True)
+def fresh_backends(monkeypatch):
+    monkeypatch.setattr(llm_backends, "_backends", {})
+    monkeypatch.setattr(llm_backends, "ROUTES", {})
+    yield
+    llm_backends.clients.reset()
+
+
+def _chats(base_url):
+    with urlopen(f"{base_url}/stats") as response:
+        return json.load(response)["chat"]
+
+
+def test_settings_set_after_import_are_read(monkeypatch):
+    # .env is loaded lazily, after this module was imported
+    monkeypatch.setenv("BYOB_SUMMARY_BACKEND", "local")
+    monkeypatch.setenv("BYOB_LOCAL_LLM_MODEL", "llama3.1:8b")
+    monkeypatch.setenv("BYOB_LOCAL_LLM_CONCURRENCY", "3")
+    backend = llm_backends.route("summarize")
+    assert backend.name == "local"
+    assert backend.model == "llama3.1:8b"
+    assert llm_backends.settings("local")["concurrency"] == 3
+
+def test_configure_overrides_the_environment(monkeypatch):
+    monkeypatch.setenv("BYOB_SUMMARY_BACKEND", "local")
+    llm_backends.configure("summarize", "openai")
+    assert llm_backends.route("summarize").name == "openai"
+
+def test_unknown_backend(monkeypatch):
+    monkeypatch.setenv("BYOB_SUMMARY_BACKEND", "nowhere")
+    with pytest.raises(ValueError):
+        llm_backends.route("summarize")
+
+def test_local_requests_go_one_conversation_each(standin_server, monkeypatch):
+    monkeypatch.setenv("BYOB_LOCAL_LLM_URL", f"{standin_server}/v1")
+    backend = llm_backends.get("local")
+    before = _chats(standin_server)
+    replies = [
+        backend.create({"model": "qwen2.5:7b", "messages": [{"role": "user", "content": f"Summarize **'{term}'**"}]})
+        for term in ("Market Share", "Sales Data")
+    ]
+    assert [reply.choices[0].message.content for reply in replies] == [
+        f"The sources report {standins.value_for(term)} for {term} in India [stand-in source]."
+        for term in ("Market Share", "Sales Data")
+    ]
+    assert _chats(standin_server) - before == 2
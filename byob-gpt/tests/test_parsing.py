@@ -0,0 +1,28 @@
+import math
+
+import pytest
+
+import parsing
+import pipeline
+import results_store
+import scoring
+
+
+@pytest.mark.parametrize("value, number", [
+    (42, 42.0),
+    (3.5, 3.5),
+    ("1,200 dealers", 1200.0),
+    ("45%", 45.0),
+    ("-2.5 points", -2.5),
+    ("not reported", None),
+    (True, None),
+    (None, None),
+])
+def test_every_module_reads_numbers_alike(value, number):
+    assert parsing.to_number(value) == number
+    assert results_store.to_number(value) == number
+    if number is None:
+        assert math.isnan(scoring.to_number(value))
+    else:
+        assert scoring.to_number(value) == number
+        assert pipeline.sources_agree([value, number])
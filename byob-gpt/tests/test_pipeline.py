@@ -0,0 +1,32 @@
+import access
+import customer
+import pipeline
+
+
+def test_score_inputs_are_numbers():
+    extracted = {
+        "Customer Satisfaction Index (CSAT)": "85%",
+        "Net Promoter Score (NPS)": "4.2/5",
+        "Social Sentiment Analysis": 61,
+        "Purchase & Post-Purchase Experience": "not reported",
+    }
+    assert pipeline.typed_values(customer.PILLAR, extracted) == {
+        "Customer Satisfaction Index (CSAT)": 85.0,
+        "Net Promoter Score (NPS)": 4.2,
+        "Social Sentiment Analysis": 61.0,
+    }
+
+def test_categorical_pillars_keep_strings():
+    extracted = {"Social Media Engagement": "High on Instagram"}
+    assert pipeline.typed_values(access.PILLAR, extracted) == extracted
+
+def test_summary_mode_applies_with_ranking_off(monkeypatch):
+    chunked = []
+    monkeypatch.setattr(pipeline, "summarize_chunks", lambda chunks, *args: chunked.append(len(list(chunks))))
+    page = " ".join(f"Audi sold {i} cars in India this quarter." for i in range(4000))
+    result = {"link": "https://a.example/1"}
+    pipeline.summarize_page(result, page, "Sales Data", "", "map_reduce", 6)
+    pipeline.summarize_page(result, page, "Sales Data", "", "map_reduce", 0)
+    # Ranked pages fit one chunk; whole pages are chunked for the summary mode
+    assert chunked[0] == 1
+    assert chunked[1] > 1
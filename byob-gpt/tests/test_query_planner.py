@@ -0,0 +1,39 @@
+import query_planner
+
+
+LAUNCH_NEWS = [
+    {"link": f"https://news.example/audi-{i}", "title": f"Audi India launches Q7 facelift {i}",
+     "snippet": "Audi India has launched the new Q7 in India at an ex-showroom price of Rs 88 lakh."}
+    for i in range(5)
+]
+NPS_NEWS = [
+    {"link": f"https://survey.example/nps-{i}", "title": f"Audi India Net Promoter Score survey {i}",
+     "snippet": "Audi's NPS among Indian luxury car owners rose this year."}
+    for i in range(3)
+]
+
+
+def _search(pools):
+    calls = []
+    def search(query, num):
+        calls.append(query)
+        return pools.get(len(calls), [])[:num]
+    return search, calls
+
+def _query_for(company_name, parameter):
+    return f"{company_name} {parameter} India"
+
+
+def test_irrelevant_pool_falls_back_to_own_query():
+    search, calls = _search({1: LAUNCH_NEWS, 2: NPS_NEWS})
+    plan = query_planner.plan_pillar("Audi", ["Net Promoter Score (NPS)"], search, _query_for, 5)
+    assert calls[1] == "Audi Net Promoter Score (NPS) India"
+    assert plan["Net Promoter Score (NPS)"] == (NPS_NEWS, calls[1])
+
+def test_parameters_take_only_their_own_results():
+    search, calls = _search({1: LAUNCH_NEWS + NPS_NEWS})
+    plan = query_planner.plan_pillar("Audi", ["Net Promoter Score (NPS)"], search, _query_for, 5)
+    assert len(calls) == 1
+    items, query = plan["Net Promoter Score (NPS)"]
+    assert items == NPS_NEWS
+    assert query == "Audi Net Promoter Score (NPS) India"
@@ -0,0 +1,34 @@
+import benchmark
+import replay
+import standins
+
+PILLARS = ["pricing"]
+
+
+def _served():
+    with standins._lock:
+        return dict(standins._counters)
+
+
+def test_replay_serves_every_recorded_call(standin_server, tmp_path):
+    cassette = str(tmp_path / "standin.json")
+    try:
+        benchmark.record("Audi", PILLARS, cassette, summary_mode="sequential", executor="threads", dedup="parameter")
+        recorded = replay.counts()
+        assert recorded["openai"]["calls"] > 0
+        assert recorded["google_cse"]["calls"] > 0
+        assert recorded["http"]["calls"] > 0
+
+        served = _served()
+        for executor, dedup in (("threads", "parameter"), ("dag", None)):
+            report = benchmark.run_benchmark(
+                "Audi", PILLARS, cassette, repeat=1, summary_mode="sequential", executor=executor, dedup=dedup,
+            )
+            calls = report["runs"][0]["calls"]
+            for kind in replay.KINDS:
+                assert calls[kind]["missing"] == 0, (executor, kind)
+                assert calls[kind]["calls"] == recorded[kind]["calls"], (executor, kind)
+        # Replays never reach the stand-ins
+        assert _served() == served
+    finally:
+        replay.load(cassette, None)
@@ -0,0 +1,49 @@
+import numpy as np
+
+import scoring
+
+
+def _table(value=50.0, brands=2):
+    table = {
+        parameter: np.full(brands, value)
+        for spec in scoring.PILLAR_SPECS.values() for parameter in spec["inputs"]
+    }
+    table["Sales Data"] = np.full(brands, 1e6)
+    return table
+
+
+def test_source_spreads_need_two_sources():
+    values = {"Audi": [10, "14%", None], "BMW": [3]}
+    spreads = scoring.source_spreads(["Audi", "BMW"], lambda brand, parameter: (values[brand], None))
+    assert np.isclose(spreads["Innovation Score"][0], np.std([10, 14], ddof=1))
+    assert np.isnan(spreads["Innovation Score"][1])
+
+def test_source_spreads_skip_parameters_without_sources():
+    assert scoring.source_spreads(["Audi"], lambda brand, parameter: ([], None)) == {}
+
+def test_agreeing_sources_spread_at_least_their_tolerance():
+    values = {"Audi": ([50, 51], 0.1), "BMW": ([50, 51], None)}
+    spreads = scoring.source_spreads(["Audi", "BMW"], lambda brand, parameter: values[brand])
+    assert np.isclose(spreads["Innovation Score"][0], 0.1 * 50.5)
+    assert np.isclose(spreads["Innovation Score"][1], np.std([50, 51], ddof=1))
+
+def test_stored_tolerance_comes_back_with_the_values(store):
+    trace = {"Innovation Score": {
+        "results": [{"link": f"https://a.example/{i}", "order": i, "Provisional value": value}
+                    for i, value in enumerate(["50", "51%"])],
+        "stopping": {"reason": "agreement", "values": ["50", "51%"], "tolerance": 0.1},
+    }}
+    reports = {"pricing": {"Company": "Audi", "Pricing Data": {"Innovation Score": 50.5}}}
+    store.record_run("Audi", reports, trace, 0.0)
+    assert store.source_values("Audi", "Innovation Score") == ([50.0, 51.0], 0.1)
+
+def test_monte_carlo_uses_source_spreads_and_falls_back_per_brand():
+    spread = np.array([0.0, np.nan])
+    intervals = scoring.monte_carlo(
+        _table(), {"Pricing Competitiveness": spread, "Innovation Score": spread}, samples=2000, seed=1
+    )
+    low, median, high = intervals["PI"][0]
+    assert low == median == high == 0.5
+    # NaN means no measured spread, so the second brand gets the flat 15%
+    low, median, high = intervals["PI"][1]
+    assert low < 0.5 < high
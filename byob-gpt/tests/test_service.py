@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from urllib.request import urlopen
+
+import byob
+import results_store
+import service
+import standins
+
+
+def _record(brand, pillars):
+    reports = {pillar: {"Company": brand, f"{pillar} score": 0.5} for pillar in pillars}
+    report = {"Company": brand, **{f"{pillar} score": 0.5 for pillar in pillars}}
+    return results_store.record_run(brand, reports, {}, time.time(), report=report)
+
+def _get(url):
+    with urlopen(url) as response:
+        return json.load(response)
+
+
+def test_all_pillar_request_skips_a_partial_run(store, monkeypatch):
+    _record("Tata", ["pricing"])
+    runs = []
+    def score_brand(brand, pillars, store, **options):
+        runs.append(pillars)
+        _record(brand, pillars or list(byob.PILLARS))
+        return {"Company": brand}
+    monkeypatch.setattr(byob, "score_brand", score_brand)
+
+    scoring = service.ScoringService()
+    response = asyncio.run(scoring.score("Tata", None, 3600, False))
+    assert response["source"] == "run"
+    assert response["pillars"] == sorted(byob.PILLARS)
+    assert runs == [None]
+
+    response = asyncio.run(scoring.score("Tata", None, 3600, False))
+    assert response["source"] == "store"
+    assert response["pillars"] == sorted(byob.PILLARS)
+
+def test_one_pillar_request_uses_a_wider_run(store):
+    run_id = _record("Tata", list(byob.PILLARS))
+    assert results_store.latest_run("Tata", ["pricing"])["run_id"] == run_id
+    assert results_store.latest_run("Tata", ["pricing"], max_age=-1) is None
+
+def test_identical_requests_share_one_run(store, monkeypatch):
+    runs = []
+    def score_brand(brand, pillars, store, **options):
+        runs.append(brand)
+        time.sleep(0.2)
+        _record(brand, pillars)
+        return {"Company": brand}
+    monkeypatch.setattr(byob, "score_brand", score_brand)
+
+    async def requests():
+        scoring = service.ScoringService()
+        responses = await asyncio.gather(
+            *(scoring.score(brand, ["pricing"], 3600, False) for brand in ["Tata", "tata", "Tata", "Tata", "Tata"])
+        )
+        return scoring, responses
+
+    scoring, responses = asyncio.run(requests())
+    assert runs == ["Tata"]
+    assert sorted(response["source"] for response in responses) == ["coalesced"] * 4 + ["run"]
+    assert len({response["run_id"] for response in responses}) == 1
+    assert scoring.counters == {"store": 0, "run": 1, "coalesced": 4, "failed": 0}
+    assert scoring.in_flight == {}
+
+def test_service_scores_against_the_standins(standin_server, store, monkeypatch):
+    monkeypatch.setattr(standins, "LATENCY", 0.05)
+
+    async def requests():
+        scoring = service.ScoringService()
+        server = await asyncio.start_server(scoring.handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        async with server:
+            first = await asyncio.gather(*(asyncio.to_thread(_get, f"{url}/score/Tata?pillars=pricing") for _ in range(3)))
+            chats = _get(f"{standin_server}/stats")["chat"]
+            again = await asyncio.to_thread(_get, f"{url}/score/Tata?pillars=pricing")
+            health = await asyncio.to_thread(_get, f"{url}/health")
+        return first, chats, again, health
+
+    first, chats, again, health = asyncio.run(requests())
+    assert sorted(response["source"] for response in first) == ["coalesced", "coalesced", "run"]
+    assert first[0]["report"]["PI Score"] is not None
+    assert first[0]["report"]["Pricing Data"]["Innovation Score"] == standins.value_for("Innovation Score")
+    assert again["source"] == "store" and again["run_id"] == first[0]["run_id"]
+    assert _get(f"{standin_server}/stats")["chat"] == chats
+    assert health["requests"] == {"store": 1, "run": 1, "coalesced": 2, "failed": 0}
@@ -6,9 +6,13 @@ from firecrawl import FirecrawlApp
 import csv
 import json
 import os
+import sys
 import time
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "byob-gpt"))
+from search_cache import cached_search
+
 load_dotenv()
 
 def normalize_brand_name(brand: str, site: str) -> str:
@@ -104,8 +108,7 @@ def extract_count_with_llm(llm, text):
     return response
 
 def search_serpapi(api_key, query, llm):
-    search = GoogleSearch({"q": query, "api_key": api_key})
-    result = search.get_dict()
+    result = cached_search("serpapi", query, lambda: GoogleSearch({"q": query, "api_key": api_key}).get_dict())
 
     if "answer_box" in result and "snippet_highlighted_words" in result["answer_box"]:
         highlighted_text = " ".join(result["answer_box"]["snippet_highlighted_words"])